@@ -0,0 +1,144 @@
+"""
+Answer many degrees-of-separation queries at once.
+
+Usage: python batch.py pairs.csv output.(csv|jsonl) [--directory DIRECTORY]
+                                                     [--snapshot]
+
+pairs.csv has a source,target header and one pair of names per row. Queries
+are grouped by source and each group is answered from a single BFS tree, so
+"everyone versus Kevin Bacon" costs about one search.
+"""
+
+import argparse
+import csv
+import json
+import statistics
+import sys
+import time
+
+import degrees
+
+
+def read_pairs(filename):
+    """
+    Returns the (source, target) name pairs listed in a CSV file.
+    """
+    with open(filename, newline="") as f:
+        return [(row["source"], row["target"]) for row in csv.DictReader(f)]
+
+
+def resolve(name):
+    """
+    Returns the person_id for a name, or raises ValueError if the name is
+    unknown or ambiguous, since a batch cannot ask which person was meant.
+    """
+    person_ids = degrees.names.get(name.lower(), set())
+    if len(person_ids) == 0:
+        raise ValueError("person not found")
+    if len(person_ids) > 1:
+        raise ValueError("ambiguous name")
+    return next(iter(person_ids))
+
+
+def run_batch(pairs):
+    """
+    Answers every (source, target) name pair and returns one result dict per
+    pair, in input order, with the path and its amortized latency.
+    """
+    results = [{"source": source, "target": target} for source, target in pairs]
+
+    # Group queries by source person
+    groups = {}
+    for result in results:
+        try:
+            source = resolve(result["source"])
+            target = resolve(result["target"])
+        except ValueError as e:
+            result["error"] = str(e)
+            result["seconds"] = 0.0
+            continue
+        groups.setdefault(source, []).append((target, result))
+
+    # One BFS tree per source answers all of its targets
+    for source, queries in groups.items():
+        start = time.perf_counter()
+        paths = degrees.shortest_paths_from(
+            source, {target for target, _ in queries})
+        seconds = (time.perf_counter() - start) / len(queries)
+        for target, result in queries:
+            path = paths[target]
+            result["degrees"] = None if path is None else len(path)
+            result["path"] = path
+            result["seconds"] = seconds
+    return results
+
+
+def write_results(results, filename):
+    """
+    Writes results as JSON lines, or as CSV if filename ends in .csv.
+    """
+    with open(filename, "w", newline="") as f:
+        if not filename.endswith(".csv"):
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+            return
+        writer = csv.writer(f)
+        writer.writerow(["source", "target", "degrees", "path", "error"])
+        for result in results:
+            path = result.get("path")
+            writer.writerow([
+                result["source"],
+                result["target"],
+                result.get("degrees", ""),
+                ";".join(f"{movie}/{person}" for movie, person in path or []),
+                result.get("error", ""),
+            ])
+
+
+def report(results, seconds):
+    """
+    Prints throughput and per-query latency percentiles.
+    """
+    latencies = sorted(result["seconds"] for result in results)
+    print(f"{len(results)} queries in {seconds:.3f}s "
+          f"({len(results) / seconds:.1f} queries/s)")
+    if len(latencies) >= 2:
+        percentiles = statistics.quantiles(latencies, n=100,
+                                           method="inclusive")
+        print(f"latency p50 {percentiles[49] * 1000:.3f}ms, "
+              f"p99 {percentiles[98] * 1000:.3f}ms")
+    errors = sum(1 for result in results if "error" in result)
+    if errors:
+        print(f"{errors} queries could not be resolved")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch degrees queries")
+    parser.add_argument("pairs", help="CSV file with source,target columns")
+    parser.add_argument("output", help="results file, .csv or .jsonl")
+    parser.add_argument("--directory", default="large")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="load from a compiled binary graph snapshot")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    if args.snapshot:
+        degrees.load_graph(args.directory)
+    else:
+        degrees.load_data(args.directory)
+    print("Data loaded.")
+
+    try:
+        pairs = read_pairs(args.pairs)
+    except KeyError:
+        sys.exit("Pairs file must have source and target columns.")
+
+    start = time.perf_counter()
+    results = run_batch(pairs)
+    seconds = time.perf_counter() - start
+    write_results(results, args.output)
+    report(results, seconds)
+
+
+if __name__ == "__main__":
+    main()
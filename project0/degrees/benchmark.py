@@ -0,0 +1,197 @@
+"""
+Benchmarks for degrees.
+
+Usage: python benchmark.py frontier [--directory DIRECTORY]
+       python benchmark.py methods [--directory DIRECTORY]
+       python benchmark.py loader [--directory DIRECTORY] [--rows N]
+
+Without a directory, benchmarks run on synthetic datasets written to a
+temporary directory by generate_dataset.
+"""
+
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+import degrees
+import loader
+import search
+from util import QueueFrontier, HashedQueueFrontier
+
+
+def generate_dataset(directory, n_people, n_movies, cast_size=8, seed=0):
+    """
+    Writes people.csv, movies.csv and stars.csv for a random dataset with
+    n_people people and n_movies movies of cast_size stars each.
+
+    Stars are drawn with a skew towards low person ids, so a few people are
+    prolific as in the real dataset.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "people.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for i in range(n_people):
+            writer.writerow([i, f"Person {i}", 1900 + i % 100])
+    with open(os.path.join(directory, "movies.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for i in range(n_movies):
+            writer.writerow([i, f"Movie {i}", 1920 + i % 100])
+    with open(os.path.join(directory, "stars.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie in range(n_movies):
+            cast = {int(n_people * rng.random() ** 2) for _ in range(cast_size)}
+            for person in sorted(cast):
+                writer.writerow([person, movie])
+
+
+def reset():
+    """
+    Clears everything loaded into the degrees module.
+    """
+    degrees.graph = None
+    degrees.names, degrees.people, degrees.movies = {}, {}, {}
+
+
+def random_pairs(n, seed=0):
+    """
+    Returns n random (source, target) pairs of loaded person ids.
+    """
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    return [(rng.choice(person_ids), rng.choice(person_ids)) for _ in range(n)]
+
+
+def time_queries(pairs, method="bfs"):
+    """
+    Returns the seconds taken to answer every pair with shortest_path.
+    """
+    start = time.perf_counter()
+    for source, target in pairs:
+        degrees.shortest_path(source, target, method)
+    return time.perf_counter() - start
+
+
+def benchmark_frontier(directory, queries):
+    """
+    Compares BFS with the list-backed QueueFrontier and the deque-backed
+    HashedQueueFrontier, on directory or on synthetic datasets of growing size.
+    """
+    if directory is not None:
+        datasets = [(directory, None)]
+    else:
+        datasets = [(None, n) for n in (500, 1_000, 2_000, 4_000)]
+
+    print(f"{'people':>8} {'QueueFrontier':>14} {'Hashed':>10} {'speedup':>8}")
+    for path, n_people in datasets:
+        with tempfile.TemporaryDirectory() as tmp:
+            if path is None:
+                path = tmp
+                generate_dataset(path, n_people, n_people // 4)
+            reset()
+            degrees.load_data(path)
+            pairs = random_pairs(queries)
+            timings = []
+            for frontier in (QueueFrontier, HashedQueueFrontier):
+                degrees.FRONTIER = frontier
+                timings.append(time_queries(pairs))
+            degrees.FRONTIER = HashedQueueFrontier
+        old, new = timings
+        print(f"{len(degrees.people):>8} {old:>13.3f}s {new:>9.3f}s "
+              f"{old / new:>7.1f}x")
+
+
+def benchmark_methods(directory, queries, n_people):
+    """
+    Compares the search engines in search.SEARCHES by people expanded and
+    wall time over the same random queries.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        if directory is None:
+            directory = tmp
+            generate_dataset(directory, n_people, n_people // 4, cast_size=4)
+        reset()
+        degrees.load_data(directory)
+    pairs = random_pairs(queries)
+
+    print(f"{'method':>14} {'explored':>10} {'seconds':>9}")
+    for method in search.SEARCHES:
+        explored = 0
+        start = time.perf_counter()
+        for source, target in pairs:
+            degrees.shortest_path(source, target, method)
+            explored += search.num_explored
+        seconds = time.perf_counter() - start
+        print(f"{method:>14} {explored:>10} {seconds:>9.3f}")
+
+
+def benchmark_loader(directory, rows, workers):
+    """
+    Compares degrees.load_data with the parallel loader on directory, or on
+    a synthetic dataset with about rows star credits.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        if directory is None:
+            directory = tmp
+            print(f"Generating {rows} star rows...")
+            generate_dataset(directory, rows // 2, rows // 8, cast_size=8)
+
+        reset()
+        start = time.perf_counter()
+        degrees.load_data(directory)
+        serial = time.perf_counter() - start
+        expected = (degrees.names, degrees.people, degrees.movies)
+
+        reset()
+        start = time.perf_counter()
+        loader.load_data(directory, degrees.names, degrees.people,
+                         degrees.movies, workers)
+        parallel = time.perf_counter() - start
+        if (degrees.names, degrees.people, degrees.movies) != expected:
+            raise AssertionError("parallel loader produced different data")
+
+    print(f"{'load_data':>16}: {serial:.3f}s")
+    print(f"{'loader.load_data':>16}: {parallel:.3f}s "
+          f"({serial / parallel:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for degrees")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    frontier = subparsers.add_parser(
+        "frontier", help="compare BFS frontier implementations")
+    frontier.add_argument("--directory", help="dataset to benchmark on")
+    frontier.add_argument("--queries", type=int, default=5)
+
+    methods = subparsers.add_parser(
+        "methods", help="compare shortest_path search engines")
+    methods.add_argument("--directory", help="dataset to benchmark on")
+    methods.add_argument("--queries", type=int, default=50)
+    methods.add_argument("--people", type=int, default=100_000,
+                         help="size of the synthetic dataset")
+
+    loader_parser = subparsers.add_parser(
+        "loader", help="compare serial and parallel CSV loading")
+    loader_parser.add_argument("--directory", help="dataset to benchmark on")
+    loader_parser.add_argument("--rows", type=int, default=1_000_000,
+                               help="star rows in the synthetic dataset")
+    loader_parser.add_argument("--workers", type=int)
+
+    args = parser.parse_args()
+    if args.benchmark == "frontier":
+        benchmark_frontier(args.directory, args.queries)
+    elif args.benchmark == "methods":
+        benchmark_methods(args.directory, args.queries, args.people)
+    elif args.benchmark == "loader":
+        benchmark_loader(args.directory, args.rows, args.workers)
+
+
+if __name__ == "__main__":
+    main()
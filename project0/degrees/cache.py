@@ -0,0 +1,158 @@
+"""
+Bounded path cache for degrees.
+
+Shortest paths are cached per unordered pair of people, so a query for
+(target, source) is answered by reversing the path stored for
+(source, target). The least recently used entry is evicted when the cache
+is full, and entries older than the optional time-to-live are dropped when
+next looked up.
+
+Caches hold person and movie ids, so they work the same over the loaded
+dicts and over a Graph, and are invalidated from the delta.Changes a delta
+reports.
+"""
+
+import time
+from collections import OrderedDict
+
+# Result of a lookup that found nothing, as a path may be None
+MISS = object()
+
+
+def reverse_path(source, path):
+    """
+    Returns the path from the last person of path back to source.
+    """
+    people = [source] + [person_id for _, person_id in path]
+    return [(movie_id, people[i])
+            for i, (movie_id, _) in reversed(list(enumerate(path)))]
+
+
+def path_credits(source, path):
+    """
+    Returns the (person_id, movie_id) credits a path relies on.
+    """
+    credits = set()
+    person = source
+    for movie_id, person_id in path:
+        credits.add((person, movie_id))
+        credits.add((person_id, movie_id))
+        person = person_id
+    return credits
+
+
+class PathCache():
+    """
+    LRU cache of shortest paths keyed by pairs of person ids, with an
+    optional time-to-live in seconds.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, clock=time.monotonic):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+
+        # Maps (source, target) with source <= target to (path, expiry)
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, source, target):
+        """
+        Returns the cached path from source to target, which may be None for
+        people known not to be connected, or MISS.
+        """
+        key = (source, target) if source <= target else (target, source)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISS
+        path, expiry = entry
+        if expiry is not None and self.clock() >= expiry:
+            del self.entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return MISS
+        self.entries.move_to_end(key)
+        self.hits += 1
+        if path is None or key[0] == source:
+            return path
+        return reverse_path(key[0], path)
+
+    def put(self, source, target, path):
+        """
+        Caches the path from source to target, evicting the least recently
+        used entry if the cache is full.
+        """
+        if source <= target:
+            key = (source, target)
+        else:
+            key = (target, source)
+            if path is not None:
+                path = reverse_path(source, path)
+        expiry = None if self.ttl is None else self.clock() + self.ttl
+        self.entries[key] = (path, expiry)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Drops every entry, keeping the counters.
+        """
+        self.invalidations += len(self.entries)
+        self.entries.clear()
+
+    def invalidate(self, changes):
+        """
+        Drops the entries a delta.Changes may have made wrong.
+
+        Removals never shorten paths, so only paths through a removed credit
+        or person go. Additions never lengthen them, so paths of one degree
+        or less stay, but longer ones and unconnected pairs may now have a
+        shorter path.
+        """
+        removed_credits = changes.removed_credits
+        removed_people = changes.removed_people
+        added = bool(changes.added_credits)
+        stale = []
+        for key, (path, _) in self.entries.items():
+            if key[0] in removed_people or key[1] in removed_people:
+                stale.append(key)
+            elif path is None:
+                if added:
+                    stale.append(key)
+            elif added and len(path) > 1:
+                stale.append(key)
+            elif removed_credits and not removed_credits.isdisjoint(
+                    path_credits(key[0], path)):
+                stale.append(key)
+        for key in stale:
+            del self.entries[key]
+        self.invalidations += len(stale)
+
+    def stats(self):
+        """
+        Returns the cache counters as a dict.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,79 @@
+"""
+Client for the degrees query server.
+
+Usage: python client.py "Name 1" "Name 2" [--url URL] [--method METHOD]
+"""
+
+import argparse
+import json
+import sys
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+URL = "http://127.0.0.1:8050"
+
+
+def request(url, path, **params):
+    """
+    Sends a GET request to the server and returns the decoded JSON reply.
+    """
+    try:
+        with urlopen(f"{url}{path}?{urlencode(params)}") as response:
+            return json.load(response)
+    except HTTPError as e:
+        return json.load(e)
+
+
+def person_id_for_name(url, name):
+    """
+    Returns the person_id for a name, asking which one if it is ambiguous.
+    """
+    people = request(url, "/person", name=name).get("people", [])
+    if len(people) == 0:
+        return None
+    elif len(people) > 1:
+        print(f"Which '{name}'?")
+        for person in people:
+            print(f"ID: {person['id']}, Name: {person['name']}, "
+                  f"Birth: {person['birth']}")
+        person_id = input("Intended Person ID: ")
+        if person_id in [person["id"] for person in people]:
+            return person_id
+        return None
+    else:
+        return people[0]["id"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Degrees query client")
+    parser.add_argument("source")
+    parser.add_argument("target")
+    parser.add_argument("--url", default=URL)
+    parser.add_argument("--method", default="bfs")
+    args = parser.parse_args()
+
+    source = person_id_for_name(args.url, args.source)
+    if source is None:
+        sys.exit("Person not found.")
+    target = person_id_for_name(args.url, args.target)
+    if target is None:
+        sys.exit("Person not found.")
+
+    reply = request(args.url, "/path", source=source, target=target,
+                    method=args.method)
+    if "error" in reply:
+        sys.exit(reply["error"])
+    if reply["path"] is None:
+        print("Not connected.")
+    else:
+        degrees = reply["degrees"]
+        names = reply["names"]
+        print(f"{degrees} degrees of separation.")
+        for i in range(degrees):
+            print(f"{i + 1}: {names[i]} and {names[i + 1]} "
+                  f"starred in {reply['titles'][i]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,17 @@
+import argparse
 import csv
+import math
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+import search
+import delta
+import loader
+from cache import MISS, PathCache
+from graph import Graph
+from landmarks import Landmarks
+from paths import PathDAG
+from search import SEARCHES
+from util import Node, HashedQueueFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,6 +22,16 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Frontier class used by the BFS in shortest_path; util.QueueFrontier is
+# the original list-backed version, kept for comparison
+FRONTIER = HashedQueueFrontier
+
+# Compiled CSR graph, set by load_graph and used in place of the dicts above
+graph = None
+
+# PathCache consulted by shortest_path, set by enable_cache
+cache = None
+
 
 def load_data(directory):
     """
@@ -52,14 +72,97 @@ def load_data(directory):
                 pass
 
 
+def load_graph(directory):
+    """
+    Load data from the binary graph snapshot in directory, compiling it
+    from the CSV files first if needed.
+    """
+    global graph, names, people, movies
+    graph = Graph.load(directory)
+    names, people, movies = graph.names, graph.people, graph.movies
+    if cache is not None:
+        cache.clear()
+
+
+def load_landmarks(directory, count=16):
+    """
+    Load the landmark distance index of directory into the loaded graph,
+    building it first if needed.
+    """
+    if graph is None:
+        raise ValueError("landmarks require a graph loaded with load_graph")
+    graph.landmarks = Landmarks.load(directory, graph, count)
+
+
+def enable_cache(maxsize=1024, ttl=None):
+    """
+    Cache up to maxsize shortest paths, for at most ttl seconds each if
+    given. Returns the PathCache, whose counters report hits and misses.
+    """
+    global cache
+    cache = PathCache(maxsize, ttl)
+    return cache
+
+
+def apply_delta(directory):
+    """
+    Apply the delta files in directory to the loaded data without reloading,
+    invalidating the parts of derived indexes the change affects.
+    Returns the delta.Changes.
+    """
+    if graph is not None:
+        data = graph
+    else:
+        data = delta.DictData(names, people, movies)
+    changes = delta.apply_delta(data, delta.read_delta(directory))
+    if graph is not None and graph.landmarks is not None:
+        graph.landmarks.invalidate(graph, changes)
+    if cache is not None:
+        cache.invalidate(changes)
+    return changes
+
+
+def print_progress(filename, done, total):
+    """
+    Prints how much of a CSV file has been loaded.
+    """
+    print(f"  {filename}: {done / total:.0%}", end="\r" if done < total else "\n")
+
+
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(description="Degrees of separation")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="load from a compiled binary graph snapshot")
+    parser.add_argument("--method", choices=sorted(SEARCHES) + ["landmarks"],
+                        default="bfs", help="search engine used to find the path")
+    parser.add_argument("--workers", type=int,
+                        help="parse the CSV files in this many processes")
+    parser.add_argument("--delta", action="append", default=[],
+                        help="apply the delta files in this directory")
+    parser.add_argument("--landmarks", action="store_true",
+                        help="use a landmark distance index (implies --snapshot)")
+    parser.add_argument("--top", type=int,
+                        help="count the shortest paths and show the best TOP")
+    parser.add_argument("--rank-by", choices=sorted(RANKINGS), default="year",
+                        help="movie weight the --top paths are ranked by")
+    args = parser.parse_args()
+    if args.method == "landmarks" and not args.landmarks:
+        sys.exit("--method landmarks requires --landmarks")
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    if args.snapshot or args.landmarks:
+        load_graph(args.directory)
+    elif args.workers:
+        loader.load_data(args.directory, names, people, movies,
+                         args.workers, progress=print_progress)
+    else:
+        load_data(args.directory)
+    if args.landmarks:
+        load_landmarks(args.directory)
+    for directory in args.delta:
+        apply_delta(directory)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,35 +172,78 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if args.top:
+        top = top_shortest_paths(source, target, args.top, args.rank_by)
+        if not top:
+            print("Not connected.")
+            return
+        print(f"{count_shortest_paths(source, target)} shortest paths, "
+              f"best {len(top)} by {args.rank_by}:")
+        for score, path in top:
+            print(f"Score {score}:")
+            print_path(source, path)
+        return
+
+    path = shortest_path(source, target, args.method)
 
     if path is None:
         print("Not connected.")
     else:
-        degrees = len(path)
-        print(f"{degrees} degrees of separation.")
-        path = [(None, source)] + path
-        for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
-            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+        print_path(source, path)
 
 
-def shortest_path(source, target):
+def print_path(source, path):
+    """
+    Prints the degrees of separation along a path and each link in it.
+    """
+    degrees = len(path)
+    print(f"{degrees} degrees of separation.")
+    path = [(None, source)] + path
+    for i in range(degrees):
+        person1 = people[path[i][1]]["name"]
+        person2 = people[path[i + 1][1]]["name"]
+        movie = movies[path[i + 1][0]]["title"]
+        print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+
+
+def shortest_path(source, target, method="bfs"):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
-    If no possible path, returns None.
+    method names the search engine in search.SEARCHES; "bidirectional"
+    grows frontiers from both people and is much faster on long paths, and
+    "movies" expands each movie once instead of building co-star sets.
+
+    If no possible path, returns None. Paths are served from the cache when
+    enable_cache has been called.
     """
+    if cache is None:
+        return search_path(source, target, method)
+    path = cache.get(source, target)
+    if path is MISS:
+        path = search_path(source, target, method)
+        cache.put(source, target, path)
+    return path
 
-    num_explored = 0
+
+def search_path(source, target, method="bfs"):
+    """
+    Searches for the shortest path from source to target with the given
+    method, bypassing the cache.
+    """
+    if graph is not None:
+        return graph.shortest_path(source, target, method)
+    if method != "bfs":
+        return SEARCHES[method](source, target, movies_for_person,
+                                stars_for_movie)
+
+    search.num_explored = 0
 
     # Initialize frontier to just the starting position
     start = Node(state=source, parent=None, action=None)
     # Use a Queue for BFS
-    frontier = QueueFrontier()
+    frontier = FRONTIER()
     frontier.add(start)
 
     # Initialize an empty explored set
@@ -114,7 +260,7 @@ def shortest_path(source, target):
 
         # Choose a node from the frontier
         node = frontier.remove()
-        num_explored += 1
+        search.num_explored += 1
 
         # If node is the goal, then we have a solution
         if node.state == target:
@@ -146,6 +292,124 @@ def shortest_path(source, target):
     return solution
 
 
+def degree_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between two
+    people from the landmark index, without searching. math.inf bounds mean
+    not connected (lower) or unknown (upper).
+    """
+    if graph is None or graph.landmarks is None:
+        return (0, 0) if source == target else (1, math.inf)
+    return graph.landmarks.bounds(*graph.person_indices(source, target))
+
+
+def degrees_of_separation(source, target):
+    """
+    Returns the number of degrees of separation between two people, or None
+    if they are not connected, answering from the landmark bounds alone
+    when they meet.
+    """
+    lower, upper = degree_bounds(source, target)
+    if lower == math.inf:
+        return None
+    if lower == upper:
+        return lower
+    path = shortest_path(source, target, "bidirectional")
+    return None if path is None else len(path)
+
+
+def shortest_paths_from(source, targets):
+    """
+    Returns a dict mapping each person_id in targets to the shortest list of
+    (movie_id, person_id) pairs connecting source to it, or None, computed
+    from one BFS tree rooted at source.
+    """
+    if graph is not None:
+        return graph.shortest_paths_from(source, targets)
+    parents = search.breadth_first_tree(
+        source, movies_for_person, stars_for_movie, targets)
+    return {
+        target: search.trace(parents, target) if target in parents else None
+        for target in targets
+    }
+
+
+def shortest_path_dag(source, target):
+    """
+    Returns the paths.PathDAG of every shortest path between two people, or
+    None if they are not connected. With a graph loaded, the DAG holds its
+    integer ids.
+    """
+    if graph is not None:
+        return PathDAG.build(*graph.person_indices(source, target),
+                             graph.movies_of, graph.stars_of)
+    return PathDAG.build(source, target, movies_for_person, stars_for_movie)
+
+
+def all_shortest_paths(source, target):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that connect
+    the source to the target, one at a time.
+    """
+    dag = shortest_path_dag(source, target)
+    if dag is None:
+        return
+    for path in dag.paths():
+        yield graph.path_ids(path) if graph is not None else path
+
+
+def count_shortest_paths(source, target):
+    """
+    Returns the number of shortest paths between two people without
+    enumerating them.
+    """
+    dag = shortest_path_dag(source, target)
+    return 0 if dag is None else dag.count()
+
+
+def movie_year(movie):
+    """
+    Returns the year of a movie as a number, 0 if unknown.
+    """
+    if graph is not None:
+        year = graph.movie_record(movie)[2]
+    else:
+        year = movies[movie]["year"]
+    return int(year) if year else 0
+
+
+def movie_popularity(movie):
+    """
+    Returns the number of people credited in a movie.
+    """
+    if graph is not None:
+        return len(graph.stars_of(movie))
+    return len(movies[movie]["stars"])
+
+
+# Movie weights top_shortest_paths can rank by
+RANKINGS = {
+    "year": movie_year,
+    "popularity": movie_popularity,
+}
+
+
+def top_shortest_paths(source, target, k=10, by="year"):
+    """
+    Returns up to k (score, path) pairs for the shortest paths between two
+    people with the highest total of the named movie weight in RANKINGS,
+    best first. Every shortest path has the same length, so ranking by
+    "year" prefers the most recent movies on average.
+    """
+    dag = shortest_path_dag(source, target)
+    if dag is None:
+        return []
+    return [
+        (score, graph.path_ids(path) if graph is not None else path)
+        for score, path in dag.top(k, RANKINGS[by])
+    ]
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -172,11 +436,27 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def movies_for_person(person_id):
+    """
+    Returns the movie_ids a given person starred in.
+    """
+    return people[person_id]["movies"]
+
+
+def stars_for_movie(movie_id):
+    """
+    Returns the person_ids of the people who starred in a given movie.
+    """
+    return movies[movie_id]["stars"]
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return graph.neighbors_for_person(person_id)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
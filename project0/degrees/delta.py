@@ -0,0 +1,188 @@
+"""
+Incremental updates for the degrees dataset.
+
+A delta is a directory holding any of people.csv, movies.csv and stars.csv
+in the usual format with an extra leading "op" column, which is "+" to add
+the row or "-" to remove it:
+
+    op,person_id,movie_id
+    +,102,95953
+    -,129,104257
+
+Rows removing people or movies only need the id. Deltas apply to the loaded
+names/people/movies dicts or to a compiled Graph without a reload, and report
+the co-star links they changed so derived indexes can invalidate only what
+the change affects.
+"""
+
+import csv
+import os
+
+
+class Delta():
+    """
+    Rows added and removed by a delta, per file.
+    """
+
+    def __init__(self):
+        self.added_people = []
+        self.removed_people = []
+        self.added_movies = []
+        self.removed_movies = []
+        self.added_stars = []
+        self.removed_stars = []
+
+
+class Changes():
+    """
+    What applying a delta changed. Links are (person_id, person_id) pairs of
+    people who became, or may have stopped being, co-stars.
+    """
+
+    def __init__(self):
+        self.added_links = set()
+        self.removed_links = set()
+        self.added_credits = set()
+        self.removed_credits = set()
+        self.removed_people = set()
+        self.removed_movies = set()
+
+    def __bool__(self):
+        return any((self.added_links, self.removed_links, self.added_credits,
+                    self.removed_credits, self.removed_people,
+                    self.removed_movies))
+
+
+class DictData():
+    """
+    Applies changes to names/people/movies dicts shaped like those built by
+    degrees.load_data, with the same methods a Graph offers.
+    """
+
+    def __init__(self, names, people, movies):
+        self.names = names
+        self.people = people
+        self.movies = movies
+
+    def add_person(self, person_id, name, birth):
+        if person_id in self.people:
+            raise ValueError(f"person {person_id} already exists")
+        self.people[person_id] = {"name": name, "birth": birth, "movies": set()}
+        self.names.setdefault(name.lower(), set()).add(person_id)
+
+    def add_movie(self, movie_id, title, year):
+        if movie_id in self.movies:
+            raise ValueError(f"movie {movie_id} already exists")
+        self.movies[movie_id] = {"title": title, "year": year, "stars": set()}
+
+    def add_star(self, person_id, movie_id):
+        movies = self.people[person_id]["movies"]
+        stars = self.movies[movie_id]["stars"]
+        movies.add(movie_id)
+        stars.add(person_id)
+
+    def remove_star(self, person_id, movie_id):
+        movies = self.people[person_id]["movies"]
+        stars = self.movies[movie_id]["stars"]
+        movies.discard(movie_id)
+        stars.discard(person_id)
+
+    def remove_person(self, person_id):
+        person = self.people.pop(person_id)
+        for movie_id in person["movies"]:
+            self.movies[movie_id]["stars"].discard(person_id)
+        key = person["name"].lower()
+        self.names[key].discard(person_id)
+        if not self.names[key]:
+            del self.names[key]
+
+    def remove_movie(self, movie_id):
+        movie = self.movies.pop(movie_id)
+        for person_id in movie["stars"]:
+            self.people[person_id]["movies"].discard(movie_id)
+
+
+def read_delta(directory):
+    """
+    Reads the delta files present in directory.
+    """
+    delta = Delta()
+    readers = {
+        "people.csv": (delta.added_people, delta.removed_people,
+                       ("id", "name", "birth")),
+        "movies.csv": (delta.added_movies, delta.removed_movies,
+                       ("id", "title", "year")),
+        "stars.csv": (delta.added_stars, delta.removed_stars,
+                      ("person_id", "movie_id")),
+    }
+    for filename, (added, removed, columns) in readers.items():
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            continue
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                values = tuple(row.get(column) or "" for column in columns)
+                if row["op"] == "+":
+                    added.append(values)
+                elif row["op"] == "-":
+                    removed.append(values if filename == "stars.csv"
+                                   else values[0])
+                else:
+                    raise ValueError(f"{path}: unknown op {row['op']!r}")
+    return delta
+
+
+def link(person_id, other_id):
+    """
+    Returns a co-star link as an ordered pair.
+    """
+    return (person_id, other_id) if person_id < other_id else (other_id, person_id)
+
+
+def apply_delta(data, delta):
+    """
+    Applies a Delta to data, a Graph or DictData, and returns the Changes.
+
+    Additions of people and movies come first and their removals last, so a
+    delta can add a movie together with its stars.
+    """
+    changes = Changes()
+    for person_id, name, birth in delta.added_people:
+        data.add_person(person_id, name, birth)
+    for movie_id, title, year in delta.added_movies:
+        data.add_movie(movie_id, title, year)
+
+    for person_id, movie_id in delta.added_stars:
+        stars = data.movies[movie_id]["stars"]
+        if person_id in stars:
+            continue
+        changes.added_credits.add((person_id, movie_id))
+        changes.added_links.update(link(person_id, other) for other in stars)
+        data.add_star(person_id, movie_id)
+
+    # Removals are recorded before applying, while the co-stars are known
+    removed_stars = list(delta.removed_stars)
+    for movie_id in delta.removed_movies:
+        changes.removed_movies.add(movie_id)
+        removed_stars.extend(
+            (person_id, movie_id)
+            for person_id in data.movies[movie_id]["stars"])
+    for person_id in delta.removed_people:
+        changes.removed_people.add(person_id)
+        removed_stars.extend(
+            (person_id, movie_id)
+            for movie_id in data.people[person_id]["movies"])
+    for person_id, movie_id in removed_stars:
+        stars = data.movies[movie_id]["stars"]
+        if person_id not in stars:
+            continue
+        changes.removed_credits.add((person_id, movie_id))
+        changes.removed_links.update(
+            link(person_id, other) for other in stars if other != person_id)
+        data.remove_star(person_id, movie_id)
+
+    for movie_id in delta.removed_movies:
+        data.remove_movie(movie_id)
+    for person_id in delta.removed_people:
+        data.remove_person(person_id)
+    return changes
@@ -0,0 +1,769 @@
+"""
+Compiled person-movie graph for degrees.
+
+People and movies are mapped to dense integer ids and the bipartite graph
+between them is stored as two CSR (compressed sparse row) adjacency
+structures: for person p, the movies they starred in are
+person_movies[person_offsets[p]:person_offsets[p + 1]], and likewise for the
+stars of a movie. The whole graph, including names and titles, is written once
+to a binary snapshot that later starts memory-map instead of parsing CSV.
+"""
+
+import csv
+import math
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+
+from search import SEARCHES, breadth_first_tree, trace
+
+# File name of the snapshot inside a data directory
+SNAPSHOT = "graph.bin"
+
+MAGIC = b"DEGRSNAP"
+VERSION = 1
+
+# Sections of a snapshot, in file order, with their array typecodes
+SECTIONS = (
+    ("person_ids.data", "B"),
+    ("person_ids.offsets", "I"),
+    ("person_names.data", "B"),
+    ("person_names.offsets", "I"),
+    ("person_births.data", "B"),
+    ("person_births.offsets", "I"),
+    ("movie_ids.data", "B"),
+    ("movie_ids.offsets", "I"),
+    ("movie_titles.data", "B"),
+    ("movie_titles.offsets", "I"),
+    ("movie_years.data", "B"),
+    ("movie_years.offsets", "I"),
+    ("person_offsets", "I"),
+    ("person_movies", "I"),
+    ("movie_offsets", "I"),
+    ("movie_people", "I"),
+    ("person_id_order", "I"),
+    ("movie_id_order", "I"),
+    ("person_name_order", "I"),
+)
+
+HEADER = struct.Struct("<8sII")
+SECTION_ENTRY = struct.Struct("<QQ")
+
+
+class StringTable():
+    """
+    Sequence of strings stored as one UTF-8 blob plus an offsets array.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        start = self.offsets[i]
+        end = self.offsets[i + 1]
+        return bytes(self.data[start:end]).decode("utf-8")
+
+    @classmethod
+    def build(cls, strings):
+        """
+        Returns a StringTable holding the given strings in order.
+        """
+        data = bytearray()
+        offsets = array("I", [0])
+        for s in strings:
+            data += s.encode("utf-8")
+            offsets.append(len(data))
+        blob = array("B")
+        blob.frombytes(data)
+        return cls(blob, offsets)
+
+
+def build_csr(edges, n_rows):
+    """
+    Returns (offsets, indices) arrays for a CSR adjacency structure with
+    n_rows rows, given (row, column) pairs sorted by row.
+    """
+    offsets = array("I", [0]) * (n_rows + 1)
+    for row, _ in edges:
+        offsets[row + 1] += 1
+    for i in range(n_rows):
+        offsets[i + 1] += offsets[i]
+    indices = array("I", (column for _, column in edges))
+    return offsets, indices
+
+
+class Graph():
+    """
+    Person-movie bipartite graph over dense integer ids.
+
+    Public methods take and return the original string ids from the CSV
+    files; the *_index methods convert between those and integer ids.
+
+    The snapshot arrays are read-only, but people, movies and star credits
+    can still be added or removed in memory; those changes are kept in an
+    Overlay consulted by every lookup.
+    """
+
+    def __init__(self, sections):
+        self.sections = sections
+        self.person_ids = StringTable(
+            sections["person_ids.data"], sections["person_ids.offsets"])
+        self.person_names = StringTable(
+            sections["person_names.data"], sections["person_names.offsets"])
+        self.person_births = StringTable(
+            sections["person_births.data"], sections["person_births.offsets"])
+        self.movie_ids = StringTable(
+            sections["movie_ids.data"], sections["movie_ids.offsets"])
+        self.movie_titles = StringTable(
+            sections["movie_titles.data"], sections["movie_titles.offsets"])
+        self.movie_years = StringTable(
+            sections["movie_years.data"], sections["movie_years.offsets"])
+        self.person_offsets = sections["person_offsets"]
+        self.person_movies = sections["person_movies"]
+        self.movie_offsets = sections["movie_offsets"]
+        self.movie_people = sections["movie_people"]
+        self.person_id_order = sections["person_id_order"]
+        self.movie_id_order = sections["movie_id_order"]
+        self.person_name_order = sections["person_name_order"]
+
+        # Optional landmarks.Landmarks distance oracle over this graph
+        self.landmarks = None
+
+        # Changes applied in memory since the snapshot, see Overlay
+        self.overlay = None
+
+        # Dict-like views so existing code can keep using names/people/movies
+        self.names = NamesView(self)
+        self.people = PeopleView(self)
+        self.movies = MoviesView(self)
+
+    @property
+    def n_people(self):
+        return len(self.person_offsets) - 1
+
+    @property
+    def n_movies(self):
+        return len(self.movie_offsets) - 1
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Parses people.csv, movies.csv and stars.csv in directory into a Graph.
+        """
+        person_ids, person_names, person_births = [], [], []
+        person_index = {}
+        with open(f"{directory}/people.csv") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for person_id, name, birth in reader:
+                if person_id in person_index:
+                    continue
+                person_index[person_id] = len(person_ids)
+                person_ids.append(person_id)
+                person_names.append(name)
+                person_births.append(birth)
+
+        movie_ids, movie_titles, movie_years = [], [], []
+        movie_index = {}
+        with open(f"{directory}/movies.csv") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for movie_id, title, year in reader:
+                if movie_id in movie_index:
+                    continue
+                movie_index[movie_id] = len(movie_ids)
+                movie_ids.append(movie_id)
+                movie_titles.append(title)
+                movie_years.append(year)
+
+        # Stars referring to unknown people or movies are skipped
+        edges = set()
+        with open(f"{directory}/stars.csv") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for person_id, movie_id in reader:
+                person = person_index.get(person_id)
+                movie = movie_index.get(movie_id)
+                if person is not None and movie is not None:
+                    edges.add((person, movie))
+
+        return cls.from_lists(
+            person_ids, person_names, person_births,
+            movie_ids, movie_titles, movie_years, edges)
+
+    @classmethod
+    def from_lists(cls, person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years, edges):
+        """
+        Builds a Graph from parallel per-person and per-movie lists and a
+        collection of (person, movie) integer id pairs.
+        """
+        by_person = sorted(edges)
+        by_movie = sorted((movie, person) for person, movie in edges)
+        person_offsets, person_movies = build_csr(by_person, len(person_ids))
+        movie_offsets, movie_people = build_csr(by_movie, len(movie_ids))
+
+        sections = {}
+        for name, strings in (
+            ("person_ids", person_ids),
+            ("person_names", person_names),
+            ("person_births", person_births),
+            ("movie_ids", movie_ids),
+            ("movie_titles", movie_titles),
+            ("movie_years", movie_years),
+        ):
+            table = StringTable.build(strings)
+            sections[f"{name}.data"] = table.data
+            sections[f"{name}.offsets"] = table.offsets
+        sections["person_offsets"] = person_offsets
+        sections["person_movies"] = person_movies
+        sections["movie_offsets"] = movie_offsets
+        sections["movie_people"] = movie_people
+
+        # Sorted orders allow id and name lookups by binary search
+        sections["person_id_order"] = array("I", sorted(
+            range(len(person_ids)), key=lambda i: person_ids[i]))
+        sections["movie_id_order"] = array("I", sorted(
+            range(len(movie_ids)), key=lambda i: movie_ids[i]))
+        sections["person_name_order"] = array("I", sorted(
+            range(len(person_names)), key=lambda i: person_names[i].lower()))
+        return cls(sections)
+
+    def save(self, path):
+        """
+        Writes the graph to a binary snapshot at path.
+
+        Arrays are stored in native byte order, so snapshots are only
+        portable between machines of the same endianness.
+        """
+        offset = HEADER.size + SECTION_ENTRY.size * len(SECTIONS)
+        entries = []
+        for name, typecode in SECTIONS:
+            # Align every section so it can be cast in place when mapped
+            offset += -offset % 8
+            section = self.sections[name]
+            entries.append((offset, len(section)))
+            offset += len(section) * array(typecode).itemsize
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(SECTIONS)))
+            for entry in entries:
+                f.write(SECTION_ENTRY.pack(*entry))
+            for (name, typecode), (start, _) in zip(SECTIONS, entries):
+                f.write(b"\0" * (start - f.tell()))
+                section = self.sections[name]
+                if not isinstance(section, array):
+                    section = array(typecode, section)
+                section.tofile(f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Memory-maps the snapshot at path and returns a Graph reading from it.
+        """
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(buffer)
+        magic, version, count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION or count != len(SECTIONS):
+            raise ValueError(f"{path} is not a compatible graph snapshot")
+        sections = {}
+        for i, (name, typecode) in enumerate(SECTIONS):
+            start, length = SECTION_ENTRY.unpack_from(
+                buffer, HEADER.size + i * SECTION_ENTRY.size)
+            size = length * array(typecode).itemsize
+            sections[name] = view[start:start + size].cast(typecode)
+        return cls(sections)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Returns the Graph for a data directory, compiling the CSV files into
+        a snapshot first if there is none or it is older than the CSV files.
+        """
+        path = os.path.join(directory, SNAPSHOT)
+        if snapshot_is_stale(directory):
+            cls.from_csv(directory).save(path)
+        return cls.open(path)
+
+    def person_index(self, person_id):
+        """
+        Returns the integer id of a person, or None if there is none.
+        """
+        overlay = self.overlay
+        if overlay is not None and person_id in overlay.person_index:
+            return overlay.person_index[person_id]
+        person = lookup(self.person_id_order, self.person_ids, person_id)
+        if overlay is not None and person in overlay.removed_people:
+            return None
+        return person
+
+    def movie_index(self, movie_id):
+        """
+        Returns the integer id of a movie, or None if there is none.
+        """
+        overlay = self.overlay
+        if overlay is not None and movie_id in overlay.movie_index:
+            return overlay.movie_index[movie_id]
+        movie = lookup(self.movie_id_order, self.movie_ids, movie_id)
+        if overlay is not None and movie in overlay.removed_movies:
+            return None
+        return movie
+
+    def person_indices(self, *person_ids):
+        """
+        Returns the integer ids of several people, raising KeyError for any
+        unknown person_id.
+        """
+        indices = []
+        for person_id in person_ids:
+            person = self.person_index(person_id)
+            if person is None:
+                raise KeyError(person_id)
+            indices.append(person)
+        return indices
+
+    def person_record(self, person):
+        """
+        Returns (person_id, name, birth) for an integer person id.
+        """
+        if person >= self.n_people:
+            return self.overlay.people[person]
+        return (self.person_ids[person], self.person_names[person],
+                self.person_births[person])
+
+    def movie_record(self, movie):
+        """
+        Returns (movie_id, title, year) for an integer movie id.
+        """
+        if movie >= self.n_movies:
+            return self.overlay.movies[movie]
+        return (self.movie_ids[movie], self.movie_titles[movie],
+                self.movie_years[movie])
+
+    def person_id(self, person):
+        """
+        Returns the string id of an integer person id.
+        """
+        if person >= self.n_people:
+            return self.overlay.people[person][0]
+        return self.person_ids[person]
+
+    def movie_id(self, movie):
+        """
+        Returns the string id of an integer movie id.
+        """
+        if movie >= self.n_movies:
+            return self.overlay.movies[movie][0]
+        return self.movie_ids[movie]
+
+    def movies_of(self, person):
+        """
+        Returns the integer ids of the movies a person starred in.
+        """
+        if self.overlay is not None:
+            return self.overlay.movies_of(self, person)
+        return self.person_movies[
+            self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def stars_of(self, movie):
+        """
+        Returns the integer ids of the people who starred in a movie.
+        """
+        if self.overlay is not None:
+            return self.overlay.stars_of(self, movie)
+        return self.movie_people[
+            self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) integer id pairs for people who starred with
+        a given person, including the person themself.
+        """
+        for movie in self.movies_of(person):
+            for costar in self.stars_of(movie):
+                yield movie, costar
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people who starred with
+        a given person.
+        """
+        person = self.person_index(person_id)
+        if person is None:
+            raise KeyError(person_id)
+        return {
+            (self.movie_id(movie), self.person_id(costar))
+            for movie, costar in self.neighbors(person)
+        }
+
+    def shortest_path(self, source_id, target_id, method="bfs"):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, found with the named
+        search engine, or with landmark A* if method is "landmarks".
+
+        If no possible path, returns None.
+        """
+        source, target = self.person_indices(source_id, target_id)
+        if self.landmarks is not None:
+            # Landmarks prove most disconnected pairs without any search
+            lower, _ = self.landmarks.bounds(source, target)
+            if lower == math.inf:
+                return None
+        if method == "landmarks":
+            if self.landmarks is None:
+                raise ValueError("no landmark index loaded")
+            consistent = self.overlay is None or not self.overlay.people
+            path = self.landmarks.search(
+                source, target, self.movies_of, self.stars_of, consistent)
+        else:
+            path = SEARCHES[method](
+                source, target, self.movies_of, self.stars_of)
+        return None if path is None else self.path_ids(path)
+
+    def shortest_paths_from(self, source_id, target_ids):
+        """
+        Returns a dict mapping each of target_ids to its shortest path from
+        the source, or None, using a single BFS tree.
+        """
+        source = self.person_index(source_id)
+        if source is None:
+            raise KeyError(source_id)
+        targets = {}
+        for target_id in target_ids:
+            target = self.person_index(target_id)
+            if target is None:
+                raise KeyError(target_id)
+            targets[target_id] = target
+        parents = breadth_first_tree(
+            source, self.movies_of, self.stars_of, set(targets.values()))
+        return {
+            target_id: (self.path_ids(trace(parents, target))
+                        if target in parents else None)
+            for target_id, target in targets.items()
+        }
+
+    def path_ids(self, path):
+        """
+        Converts a path of integer (movie, person) pairs to string ids.
+        """
+        return [
+            (self.movie_id(movie), self.person_id(person))
+            for movie, person in path
+        ]
+
+    def add_person(self, person_id, name, birth):
+        """
+        Adds a person with no movies.
+        """
+        if self.person_index(person_id) is not None:
+            raise ValueError(f"person {person_id} already exists")
+        overlay = self.changes()
+        person = overlay.next_person
+        overlay.next_person += 1
+        overlay.people[person] = (person_id, name, birth)
+        overlay.person_index[person_id] = person
+        overlay.names.setdefault(name.lower(), set()).add(person)
+
+    def add_movie(self, movie_id, title, year):
+        """
+        Adds a movie with no stars.
+        """
+        if self.movie_index(movie_id) is not None:
+            raise ValueError(f"movie {movie_id} already exists")
+        overlay = self.changes()
+        movie = overlay.next_movie
+        overlay.next_movie += 1
+        overlay.movies[movie] = (movie_id, title, year)
+        overlay.movie_index[movie_id] = movie
+
+    def add_star(self, person_id, movie_id):
+        """
+        Records that a person starred in a movie.
+        """
+        person, movie = self.credit_indices(person_id, movie_id)
+        overlay = self.changes()
+        if (person, movie) in overlay.removed_credits:
+            overlay.removed_credits.discard((person, movie))
+        elif movie not in self.movies_of(person):
+            overlay.added_credits.add((person, movie))
+            overlay.person_movies.setdefault(person, set()).add(movie)
+            overlay.movie_people.setdefault(movie, set()).add(person)
+
+    def remove_star(self, person_id, movie_id):
+        """
+        Removes the record of a person starring in a movie.
+        """
+        person, movie = self.credit_indices(person_id, movie_id)
+        overlay = self.changes()
+        if (person, movie) in overlay.added_credits:
+            overlay.added_credits.discard((person, movie))
+            overlay.person_movies[person].discard(movie)
+            overlay.movie_people[movie].discard(person)
+        elif movie in self.movies_of(person):
+            overlay.removed_credits.add((person, movie))
+
+    def remove_person(self, person_id):
+        """
+        Removes a person and all of their star credits.
+        """
+        person = self.person_index(person_id)
+        if person is None:
+            raise KeyError(person_id)
+        for movie in list(self.movies_of(person)):
+            self.remove_star(person_id, self.movie_id(movie))
+        overlay = self.changes()
+        if person in overlay.people:
+            _, name, _ = overlay.people.pop(person)
+            del overlay.person_index[person_id]
+            overlay.names[name.lower()].discard(person)
+        else:
+            overlay.removed_people.add(person)
+
+    def remove_movie(self, movie_id):
+        """
+        Removes a movie and all of its star credits.
+        """
+        movie = self.movie_index(movie_id)
+        if movie is None:
+            raise KeyError(movie_id)
+        for person in list(self.stars_of(movie)):
+            self.remove_star(self.person_id(person), movie_id)
+        overlay = self.changes()
+        if movie in overlay.movies:
+            del overlay.movies[movie]
+            del overlay.movie_index[movie_id]
+        else:
+            overlay.removed_movies.add(movie)
+
+    def credit_indices(self, person_id, movie_id):
+        """
+        Returns the integer ids of a person and a movie, raising KeyError if
+        either is unknown.
+        """
+        person = self.person_index(person_id)
+        if person is None:
+            raise KeyError(person_id)
+        movie = self.movie_index(movie_id)
+        if movie is None:
+            raise KeyError(movie_id)
+        return person, movie
+
+    def changes(self):
+        """
+        Returns the overlay of in-memory changes, creating it if needed.
+        """
+        if self.overlay is None:
+            self.overlay = Overlay(self)
+        return self.overlay
+
+
+class Overlay():
+    """
+    People, movies and star credits added to or removed from a Graph since
+    its snapshot was built. New people and movies get integer ids following
+    the snapshot's own.
+    """
+
+    def __init__(self, graph):
+        # Records and id lookups for added people and movies
+        self.people = {}
+        self.movies = {}
+        self.person_index = {}
+        self.movie_index = {}
+        self.names = {}
+        self.next_person = graph.n_people
+        self.next_movie = graph.n_movies
+
+        # Snapshot people and movies that were removed
+        self.removed_people = set()
+        self.removed_movies = set()
+
+        # (person, movie) credits added on top of or removed from the snapshot
+        self.added_credits = set()
+        self.removed_credits = set()
+        self.person_movies = {}
+        self.movie_people = {}
+
+    def movies_of(self, graph, person):
+        """
+        Returns the movies of a person with the changes applied.
+        """
+        movies = ()
+        if person < graph.n_people:
+            movies = graph.person_movies[
+                graph.person_offsets[person]:graph.person_offsets[person + 1]]
+            if self.removed_credits:
+                movies = [movie for movie in movies
+                          if (person, movie) not in self.removed_credits]
+        added = self.person_movies.get(person)
+        return [*movies, *added] if added else movies
+
+    def stars_of(self, graph, movie):
+        """
+        Returns the stars of a movie with the changes applied.
+        """
+        people = ()
+        if movie < graph.n_movies:
+            people = graph.movie_people[
+                graph.movie_offsets[movie]:graph.movie_offsets[movie + 1]]
+            if self.removed_credits:
+                people = [person for person in people
+                          if (person, movie) not in self.removed_credits]
+        added = self.movie_people.get(movie)
+        return [*people, *added] if added else people
+
+
+def lookup(order, table, key):
+    """
+    Returns the index i with table[i] == key using the sorted order, or None.
+    """
+    position = bisect_left(order, key, key=lambda i: table[i])
+    if position < len(order) and table[order[position]] == key:
+        return order[position]
+    return None
+
+
+def snapshot_is_stale(directory):
+    """
+    Returns True if the snapshot in directory is missing or out of date.
+    """
+    path = os.path.join(directory, SNAPSHOT)
+    if not os.path.exists(path):
+        return True
+    built = os.path.getmtime(path)
+    return any(
+        os.path.getmtime(os.path.join(directory, name)) > built
+        for name in ("people.csv", "movies.csv", "stars.csv")
+    )
+
+
+class PeopleView(Mapping):
+    """
+    Read-only view of a Graph shaped like degrees.people.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        person = self.graph.person_index(person_id)
+        if person is None:
+            raise KeyError(person_id)
+        _, name, birth = self.graph.person_record(person)
+        return {
+            "name": name,
+            "birth": birth,
+            "movies": {self.graph.movie_id(movie)
+                       for movie in self.graph.movies_of(person)},
+        }
+
+    def __iter__(self):
+        overlay = self.graph.overlay
+        for i in range(self.graph.n_people):
+            if overlay is None or i not in overlay.removed_people:
+                yield self.graph.person_ids[i]
+        if overlay is not None:
+            yield from overlay.person_index
+
+    def __len__(self):
+        overlay = self.graph.overlay
+        if overlay is None:
+            return self.graph.n_people
+        return (self.graph.n_people - len(overlay.removed_people)
+                + len(overlay.people))
+
+
+class MoviesView(Mapping):
+    """
+    Read-only view of a Graph shaped like degrees.movies.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        movie = self.graph.movie_index(movie_id)
+        if movie is None:
+            raise KeyError(movie_id)
+        _, title, year = self.graph.movie_record(movie)
+        return {
+            "title": title,
+            "year": year,
+            "stars": {self.graph.person_id(person)
+                      for person in self.graph.stars_of(movie)},
+        }
+
+    def __iter__(self):
+        overlay = self.graph.overlay
+        for i in range(self.graph.n_movies):
+            if overlay is None or i not in overlay.removed_movies:
+                yield self.graph.movie_ids[i]
+        if overlay is not None:
+            yield from overlay.movie_index
+
+    def __len__(self):
+        overlay = self.graph.overlay
+        if overlay is None:
+            return self.graph.n_movies
+        return (self.graph.n_movies - len(overlay.removed_movies)
+                + len(overlay.movies))
+
+
+class NamesView(Mapping):
+    """
+    Read-only view of a Graph shaped like degrees.names.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def name_key(self, i):
+        return self.graph.person_names[i].lower()
+
+    def __getitem__(self, name):
+        order = self.graph.person_name_order
+        overlay = self.graph.overlay
+        name = name.lower()
+        position = bisect_left(order, name, key=self.name_key)
+        person_ids = set()
+        while position < len(order) and self.name_key(order[position]) == name:
+            person = order[position]
+            if overlay is None or person not in overlay.removed_people:
+                person_ids.add(self.graph.person_ids[person])
+            position += 1
+        if overlay is not None:
+            for person in overlay.names.get(name, ()):
+                person_ids.add(overlay.people[person][0])
+        if not person_ids:
+            raise KeyError(name)
+        return person_ids
+
+    def __iter__(self):
+        overlay = self.graph.overlay
+        seen = set()
+        for i in self.graph.person_name_order:
+            if overlay is not None and i in overlay.removed_people:
+                continue
+            name = self.name_key(i)
+            if name not in seen:
+                seen.add(name)
+                yield name
+        if overlay is not None:
+            for name, people in overlay.names.items():
+                if people and name not in seen:
+                    seen.add(name)
+                    yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
@@ -0,0 +1,390 @@
+"""
+Landmark distance oracle for degrees.
+
+BFS distances from a few high-degree landmark people are stored as one uint8
+array per landmark. By the triangle inequality, for any landmark L
+
+    |d(L, s) - d(L, t)| <= d(s, t) <= d(L, s) + d(L, t)
+
+which gives instant lower and upper bounds on the degrees of separation
+between any two people, and an admissible heuristic for A* search.
+
+Usage: python landmarks.py build [directory] [--count K]
+       python landmarks.py report [directory] [--queries N]
+"""
+
+import argparse
+import heapq
+import math
+import mmap
+import os
+import random
+import statistics
+import struct
+import time
+from array import array
+from collections import deque
+
+import search
+from graph import Graph, SNAPSHOT, lookup
+
+# File name of the index inside a data directory
+INDEX = "landmarks.bin"
+
+MAGIC = b"DEGRLMRK"
+VERSION = 1
+HEADER = struct.Struct("<8sIII")
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 255
+
+
+def graph_size(graph):
+    """
+    Returns the number of people and movies in a graph, including those a
+    delta added on top of its snapshot.
+    """
+    if graph.overlay is None:
+        return graph.n_people, graph.n_movies
+    return graph.overlay.next_person, graph.overlay.next_movie
+
+
+def distances_from(graph, source):
+    """
+    Returns an array of BFS distances from source to every person, capped
+    below UNREACHABLE.
+    """
+    n_people, n_movies = graph_size(graph)
+    distances = array("B", [UNREACHABLE]) * n_people
+    seen_movies = bytearray(n_movies)
+    distances[source] = 0
+    frontier = deque([source])
+    while frontier:
+        person = frontier.popleft()
+        distance = min(distances[person] + 1, UNREACHABLE - 1)
+        for movie in graph.movies_of(person):
+            if seen_movies[movie]:
+                continue
+            seen_movies[movie] = 1
+            for costar in graph.stars_of(movie):
+                if distances[costar] == UNREACHABLE:
+                    distances[costar] = distance
+                    frontier.append(costar)
+    return distances
+
+
+class Landmarks():
+    """
+    BFS distances from each landmark to every person in a Graph, indexed by
+    the graph's integer person ids.
+    """
+
+    def __init__(self, n_people, landmarks, distances):
+        self.n_people = n_people
+        self.landmarks = landmarks
+        self.distances = distances
+
+        # Positions of landmarks whose distances a delta may have changed
+        self.stale = set()
+
+    @classmethod
+    def build(cls, graph, count=16):
+        """
+        Picks the count people with the most movies as landmarks and
+        computes their distances to everyone, with any delta applied.
+        """
+        n_people, _ = graph_size(graph)
+        if graph.overlay is None:
+            degree = (lambda p:
+                      graph.person_offsets[p + 1] - graph.person_offsets[p])
+        else:
+            degree = lambda p: len(graph.movies_of(p))
+        landmarks = sorted(range(n_people), key=degree, reverse=True)[:count]
+        distances = array("B")
+        for landmark in landmarks:
+            distances.extend(distances_from(graph, landmark))
+        return cls(n_people, array("I", landmarks), distances)
+
+    def save(self, path):
+        """
+        Writes the index to path.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(
+                MAGIC, VERSION, self.n_people, len(self.landmarks)))
+            array("I", self.landmarks).tofile(f)
+            array("B", self.distances).tofile(f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Memory-maps the index at path.
+        """
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_people, count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a compatible landmark index")
+        view = memoryview(buffer)
+        start = HEADER.size
+        landmarks = view[start:start + 4 * count].cast("I")
+        distances = view[start + 4 * count:].cast("B")
+        return cls(n_people, landmarks, distances)
+
+    @classmethod
+    def load(cls, directory, graph, count=16):
+        """
+        Returns the index for a data directory, building it if there is none
+        or it is older than the graph snapshot. Once a delta has been
+        applied the saved index is out of date, so a new one is built in
+        memory instead.
+        """
+        if graph.overlay is not None:
+            return cls.build(graph, count)
+        path = os.path.join(directory, INDEX)
+        snapshot = os.path.join(directory, SNAPSHOT)
+        if (not os.path.exists(path)
+                or os.path.getmtime(path) < os.path.getmtime(snapshot)):
+            cls.build(graph, count).save(path)
+        landmarks = cls.open(path)
+        if landmarks.n_people != graph.n_people:
+            raise ValueError(f"{path} does not match the graph snapshot")
+        return landmarks
+
+    def distance(self, i, person):
+        """
+        Returns the distance from the i-th landmark to a person, or None for
+        people added since the index was built.
+        """
+        if person >= self.n_people:
+            return None
+        return self.distances[i * self.n_people + person]
+
+    def live(self):
+        """
+        Returns the positions of the landmarks that are still valid.
+        """
+        return [i for i in range(len(self.landmarks)) if i not in self.stale]
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the distance between two people.
+
+        Both are math.inf if some landmark reaches exactly one of them, since
+        they are then not connected; upper is math.inf if no landmark reaches
+        both.
+        """
+        if source == target:
+            return 0, 0
+        if source >= self.n_people or target >= self.n_people:
+            return 1, math.inf
+        lower, upper = 0, math.inf
+        for i in self.live():
+            s = self.distance(i, source)
+            t = self.distance(i, target)
+            if s == UNREACHABLE and t == UNREACHABLE:
+                continue
+            if s == UNREACHABLE or t == UNREACHABLE:
+                return math.inf, math.inf
+            lower = max(lower, abs(s - t))
+            upper = min(upper, s + t)
+        return lower, upper
+
+    def search(self, source, target, movies_of, stars_of, consistent=True):
+        """
+        Returns a shortest path from source to target using A* with the
+        landmark lower bound as heuristic, never expanding people whose
+        bound exceeds the landmark upper bound.
+
+        People added since the index was built get a heuristic of 0, which
+        keeps it admissible but not consistent; pass consistent=False if
+        there are any, so movies may be expanded more than once.
+        """
+        search.num_explored = 0
+        lower, upper = self.bounds(source, target)
+        if lower == math.inf:
+            return None
+        if source == target:
+            return []
+
+        if target >= self.n_people:
+            targets = []
+        else:
+            targets = [(i, self.distance(i, target)) for i in self.live()]
+        stride = self.n_people
+
+        def heuristic(person):
+            if person >= stride:
+                return 0
+            h = 0
+            for i, t in targets:
+                d = self.distances[i * stride + person]
+                if d == UNREACHABLE:
+                    if t != UNREACHABLE:
+                        return math.inf
+                    continue
+                if t != UNREACHABLE and abs(d - t) > h:
+                    h = abs(d - t)
+            return h
+
+        parents = {source: None}
+        depth = {source: 0}
+        heap = [(lower, 0, source)]
+        seen_movies = set()
+        while heap:
+            _, g, person = heapq.heappop(heap)
+            if g > depth[person]:
+                continue
+            search.num_explored += 1
+            if person == target:
+                return search.trace(parents, target)
+            for movie in movies_of(person):
+                if movie in seen_movies:
+                    continue
+                if consistent:
+                    seen_movies.add(movie)
+                for costar in stars_of(movie):
+                    if costar in depth and depth[costar] <= g + 1:
+                        continue
+                    f = g + 1 + heuristic(costar)
+                    if f > upper:
+                        continue
+                    parents[costar] = (movie, person)
+                    depth[costar] = g + 1
+                    heapq.heappush(heap, (f, g + 1, costar))
+        return None
+
+    def invalidate(self, graph, changes):
+        """
+        Marks stale the landmarks whose distances a delta.Changes may have
+        changed, given the graph it was applied to.
+
+        A new link between people at distances d and e from a landmark can
+        only shorten distances if |d - e| > 1, and a removed link can only
+        lengthen them if |d - e| == 1. People added since the index was
+        built have no distances, so for each group of them the distances of
+        the indexed people they link to must stay within 2 of each other.
+        """
+        live = set(self.live())
+        for i in live.copy():
+            if graph.person_ids[self.landmarks[i]] in changes.removed_people:
+                live.discard(i)
+
+        # Removed people are gone from the graph, so use snapshot ids
+        for link in changes.removed_links:
+            p, q = (lookup(graph.person_id_order, graph.person_ids, person_id)
+                    for person_id in link)
+            if p is None or q is None:
+                continue
+            for i in list(live):
+                if abs(self.distance(i, p) - self.distance(i, q)) == 1:
+                    live.discard(i)
+
+        added = set()
+        for link in changes.added_links:
+            p, q = (graph.person_index(person_id) for person_id in link)
+            if p is None or q is None:
+                continue
+            if p >= self.n_people or q >= self.n_people:
+                added.update(person for person in (p, q)
+                             if person >= self.n_people)
+                continue
+            for i in list(live):
+                d, e = self.distance(i, p), self.distance(i, q)
+                if (d == UNREACHABLE) != (e == UNREACHABLE) or abs(d - e) > 1:
+                    live.discard(i)
+
+        # Group new people by links among themselves and check the indexed
+        # people each group touches
+        while added:
+            group = deque([added.pop()])
+            indexed = set()
+            while group:
+                person = group.popleft()
+                for _, costar in graph.neighbors(person):
+                    if costar < self.n_people:
+                        indexed.add(costar)
+                    elif costar in added:
+                        added.discard(costar)
+                        group.append(costar)
+            for i in list(live):
+                distances = {self.distance(i, person) for person in indexed}
+                reachable = distances - {UNREACHABLE}
+                if reachable and (len(reachable) != len(distances)
+                                  or max(reachable) - min(reachable) > 2):
+                    live.discard(i)
+
+        self.stale.update(set(range(len(self.landmarks))) - live)
+
+
+def report(graph, landmarks, queries, seed=0):
+    """
+    Prints the accuracy of the landmark bounds against exact BFS, and the
+    latency of bounds, bidirectional BFS and landmark A* on random pairs.
+    """
+    rng = random.Random(seed)
+    pairs = [(rng.randrange(graph.n_people), rng.randrange(graph.n_people))
+             for _ in range(queries)]
+    exact_hits = lower_hits = upper_hits = 0
+    gaps = []
+    timings = {"bounds": [], "bidirectional": [], "landmarks": []}
+    for source, target in pairs:
+        start = time.perf_counter()
+        lower, upper = landmarks.bounds(source, target)
+        timings["bounds"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        path = search.bidirectional_search(
+            source, target, graph.movies_of, graph.stars_of)
+        timings["bidirectional"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        alt = landmarks.search(source, target, graph.movies_of, graph.stars_of)
+        timings["landmarks"].append(time.perf_counter() - start)
+
+        exact = math.inf if path is None else len(path)
+        if (alt is None) != (path is None) or (
+                path is not None and len(alt) != exact):
+            raise AssertionError(f"landmark search wrong for {source, target}")
+        lower_hits += lower == exact
+        upper_hits += upper == exact
+        exact_hits += lower == upper == exact
+        if exact != math.inf and upper != math.inf:
+            gaps.append(upper - lower)
+
+    print(f"{queries} random pairs, {len(landmarks.landmarks)} landmarks")
+    print(f"lower bound exact: {lower_hits / queries:.1%}")
+    print(f"upper bound exact: {upper_hits / queries:.1%}")
+    print(f"distance known from bounds alone: {exact_hits / queries:.1%}")
+    if gaps:
+        print(f"mean upper - lower gap: {statistics.mean(gaps):.2f}")
+    for name, seconds in timings.items():
+        print(f"{name:>14}: mean {statistics.mean(seconds) * 1000:.3f}ms, "
+              f"max {max(seconds) * 1000:.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Landmark distance oracle")
+    parser.add_argument("command", choices=["build", "report"])
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--count", type=int, default=16,
+                        help="number of landmarks to build")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    graph = Graph.load(args.directory)
+    if args.command == "build":
+        start = time.perf_counter()
+        landmarks = Landmarks.build(graph, args.count)
+        landmarks.save(os.path.join(args.directory, INDEX))
+        print(f"Built {len(landmarks.landmarks)} landmarks in "
+              f"{time.perf_counter() - start:.2f}s")
+    else:
+        report(graph, Landmarks.load(args.directory, graph, args.count),
+               args.queries)
+
+
+if __name__ == "__main__":
+    main()
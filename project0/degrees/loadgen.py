@@ -0,0 +1,70 @@
+"""
+Load generator for the degrees query server.
+
+Usage: python loadgen.py [directory] [--requests N] [--concurrency C]
+                                     [--url URL] [--method METHOD]
+
+Random person pairs are sampled from the graph snapshot of directory, sent
+to the server from C concurrent connections, and latency percentiles and
+throughput are reported.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from client import URL, request
+from graph import Graph
+
+
+def sample_pairs(directory, n, seed=0):
+    """
+    Returns n random (source, target) person id pairs from a snapshot.
+    """
+    graph = Graph.load(directory)
+    rng = random.Random(seed)
+    return [
+        (graph.person_ids[rng.randrange(graph.n_people)],
+         graph.person_ids[rng.randrange(graph.n_people)])
+        for _ in range(n)
+    ]
+
+
+def timed_request(url, source, target, method):
+    """
+    Returns the seconds taken by one /path request.
+    """
+    start = time.perf_counter()
+    request(url, "/path", source=source, target=target, method=method)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Degrees server load test")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--url", default=URL)
+    parser.add_argument("--method", default="bfs")
+    args = parser.parse_args()
+
+    pairs = sample_pairs(args.directory, args.requests)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        latencies = list(executor.map(
+            lambda pair: timed_request(args.url, *pair, args.method), pairs))
+    seconds = time.perf_counter() - start
+
+    print(f"{len(latencies)} requests in {seconds:.3f}s "
+          f"({len(latencies) / seconds:.1f} requests/s)")
+    if len(latencies) >= 2:
+        percentiles = statistics.quantiles(latencies, n=100,
+                                           method="inclusive")
+        print(f"latency p50 {percentiles[49] * 1000:.3f}ms, "
+              f"p99 {percentiles[98] * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+All shortest paths between two people.
+
+A layered bidirectional BFS keeps, for every person it reaches, every
+(movie, person) link from the previous layer instead of a single parent.
+Pruned to the people that lie on some shortest path, these links form the
+layer DAG between source and target, from which paths are enumerated
+lazily, counted by dynamic programming over the layers without enumerating
+them, or ranked best first by a per-movie weight.
+
+Like the search engines, the DAG works on whatever ids movies_of and
+stars_of use.
+"""
+
+import heapq
+import itertools
+
+import search
+
+
+def expand(layer, depth, links, movies_of, stars_of):
+    """
+    Returns the next BFS layer after layer, recording in links every link
+    into it from layer.
+    """
+    next_depth = depth[layer[0]] + 1
+    next_layer = []
+    for person in layer:
+        search.num_explored += 1
+        for movie, costar in search.costars(person, movies_of, stars_of):
+            known = depth.get(costar)
+            if known is None:
+                depth[costar] = next_depth
+                links[costar] = [(movie, person)]
+                next_layer.append(costar)
+            elif known == next_depth:
+                links[costar].append((movie, person))
+    return next_layer
+
+
+class PathDAG():
+    """
+    The shortest paths from source to target, as the (movie, person) links
+    into each person from the layer before it.
+    """
+
+    def __init__(self, source, target, parents, layers):
+        self.source = source
+        self.target = target
+        self.parents = parents
+        self.layers = layers
+
+    @property
+    def degrees(self):
+        return len(self.layers) - 1
+
+    @classmethod
+    def build(cls, source, target, movies_of, stars_of):
+        """
+        Returns the PathDAG between two people, or None if they are not
+        connected.
+        """
+        search.num_explored = 0
+        if source == target:
+            return cls(source, target, {}, [[source]])
+
+        forward_depth, forward_links = {source: 0}, {}
+        backward_depth, backward_links = {target: 0}, {}
+        forward_frontier, backward_frontier = [source], [target]
+        meeting = None
+        while forward_frontier and backward_frontier and not meeting:
+
+            # Expand one whole layer of the smaller frontier, then keep the
+            # people in it closest to the other end
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier = expand(forward_frontier, forward_depth,
+                                          forward_links, movies_of, stars_of)
+                layer, other_depth = forward_frontier, backward_depth
+            else:
+                backward_frontier = expand(backward_frontier, backward_depth,
+                                           backward_links, movies_of, stars_of)
+                layer, other_depth = backward_frontier, forward_depth
+            met = [person for person in layer if person in other_depth]
+            if met:
+                closest = min(other_depth[person] for person in met)
+                meeting = [person for person in met
+                           if other_depth[person] == closest]
+        if not meeting:
+            return None
+
+        distance = forward_depth[meeting[0]] + backward_depth[meeting[0]]
+        depth = {person: forward_depth[person] for person in meeting}
+        parents = {}
+
+        # Walk back to source through the links found from source...
+        stack = list(meeting)
+        while stack:
+            person = stack.pop()
+            if person == source:
+                continue
+            parents[person] = forward_links[person]
+            for _, parent in parents[person]:
+                if parent not in depth:
+                    depth[parent] = forward_depth[parent]
+                    stack.append(parent)
+
+        # ...and forward to target through those found from target, which
+        # point the other way
+        stack = list(meeting)
+        while stack:
+            person = stack.pop()
+            if person == target:
+                continue
+            for movie, child in backward_links[person]:
+                parents.setdefault(child, []).append((movie, person))
+                if child not in depth:
+                    depth[child] = distance - backward_depth[child]
+                    stack.append(child)
+
+        layers = [[] for _ in range(distance + 1)]
+        for person, d in depth.items():
+            layers[d].append(person)
+        return cls(source, target, parents, layers)
+
+    def count(self):
+        """
+        Returns the number of shortest paths, counting the paths into each
+        person layer by layer.
+        """
+        ways = {self.source: 1}
+        for layer in self.layers[1:]:
+            for person in layer:
+                ways[person] = sum(
+                    ways[parent] for _, parent in self.parents[person])
+        return ways[self.target]
+
+    def paths(self):
+        """
+        Yields every shortest path as a list of (movie, person) pairs, one
+        at a time.
+        """
+        def paths_to(person):
+            if person == self.source:
+                yield []
+                return
+            for movie, parent in self.parents[person]:
+                for path in paths_to(parent):
+                    path.append((movie, person))
+                    yield path
+
+        # Each path is built in the list yielded for it at source
+        yield from paths_to(self.target)
+
+    def ranked(self, weight):
+        """
+        Yields (score, path) for every shortest path in decreasing order of
+        score, the sum of weight(movie) over the movies along the path.
+
+        The best score of any path into each person is computed layer by
+        layer, so a best-first search back from target always knows the
+        exact best completion of each partial path and pops complete paths
+        in order.
+        """
+        weights = {}
+
+        def movie_weight(movie):
+            if movie not in weights:
+                weights[movie] = weight(movie)
+            return weights[movie]
+
+        best = {self.source: 0}
+        for layer in self.layers[1:]:
+            for person in layer:
+                best[person] = max(best[parent] + movie_weight(movie)
+                                   for movie, parent in self.parents[person])
+
+        # Entries hold partial paths from some person to target as linked
+        # (movie, person, rest) tuples
+        counter = itertools.count()
+        heap = [(-best[self.target], next(counter), self.target, 0, None)]
+        while heap:
+            _, _, person, score, suffix = heapq.heappop(heap)
+            if person == self.source:
+                path = []
+                while suffix is not None:
+                    movie, child, suffix = suffix
+                    path.append((movie, child))
+                yield score, path
+                continue
+            for movie, parent in self.parents[person]:
+                parent_score = score + movie_weight(movie)
+                heapq.heappush(heap, (
+                    -(best[parent] + parent_score), next(counter), parent,
+                    parent_score, (movie, person, suffix)))
+
+    def top(self, k, weight):
+        """
+        Returns the k best (score, path) pairs, as ranked by ranked.
+        """
+        return list(itertools.islice(self.ranked(weight), k))
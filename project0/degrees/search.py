@@ -0,0 +1,198 @@
+"""
+Search engines for degrees.
+
+Each engine finds a shortest path between two people given movies_of, which
+returns the movies a person starred in, and stars_of, which returns the people
+who starred in a movie. It returns the path as a list of (movie, person) pairs
+leading from source to target, or None.
+"""
+
+from collections import deque
+
+# Number of states expanded by the most recent search
+num_explored = 0
+
+
+def costars(person, movies_of, stars_of):
+    """
+    Yields (movie, person) pairs for people who starred with a given person.
+    """
+    for movie in movies_of(person):
+        for costar in stars_of(movie):
+            yield movie, costar
+
+
+def trace(parents, state):
+    """
+    Returns the (action, state) steps leading to state in a parents map,
+    where parents maps each reached state to its (action, parent) pair.
+    """
+    path = []
+    while parents[state] is not None:
+        action, parent = parents[state]
+        path.append((action, state))
+        state = parent
+    path.reverse()
+    return path
+
+
+def breadth_first_search(source, target, movies_of, stars_of):
+    """
+    Returns a shortest path from source to target using a one-sided BFS.
+    """
+    global num_explored
+    num_explored = 0
+
+    parents = {source: None}
+    frontier = deque([source])
+    while frontier:
+        state = frontier.popleft()
+        num_explored += 1
+        if state == target:
+            return trace(parents, target)
+        for action, neighbor in costars(state, movies_of, stars_of):
+            if neighbor not in parents:
+                parents[neighbor] = (action, state)
+                frontier.append(neighbor)
+    return None
+
+
+def bidirectional_search(source, target, movies_of, stars_of):
+    """
+    Returns a shortest path from source to target by growing BFS frontiers
+    from both ends, always expanding the smaller one, until they meet.
+    """
+    global num_explored
+    num_explored = 0
+    if source == target:
+        return []
+
+    # Parents and depths of every state reached from each end
+    forward, forward_depth = {source: None}, {source: 0}
+    backward, backward_depth = {target: None}, {target: 0}
+    forward_frontier, backward_frontier = [source], [target]
+
+    while forward_frontier and backward_frontier:
+
+        # Expand one whole layer of the smaller frontier
+        if len(forward_frontier) <= len(backward_frontier):
+            parents, depth = forward, forward_depth
+            other, other_depth = backward, backward_depth
+            frontier = forward_frontier
+        else:
+            parents, depth = backward, backward_depth
+            other, other_depth = forward, forward_depth
+            frontier = backward_frontier
+
+        layer = []
+        meeting = None
+        for state in frontier:
+            num_explored += 1
+            for action, neighbor in costars(state, movies_of, stars_of):
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = (action, state)
+                depth[neighbor] = depth[state] + 1
+                layer.append(neighbor)
+
+                # Keep the meeting person giving the shortest total path
+                if neighbor in other:
+                    length = depth[neighbor] + other_depth[neighbor]
+                    if meeting is None or length < meeting[0]:
+                        meeting = (length, neighbor)
+
+        if meeting is not None:
+            return join(forward, backward, meeting[1])
+
+        if frontier is forward_frontier:
+            forward_frontier = layer
+        else:
+            backward_frontier = layer
+
+    return None
+
+
+def movie_search(source, target, movies_of, stars_of):
+    """
+    Returns a shortest path from source to target using a BFS that treats
+    movies as intermediate nodes: each movie is expanded at most once, so a
+    large cast is never enumerated twice, and co-stars are streamed lazily
+    instead of being collected into a set per person.
+    """
+    global num_explored
+    num_explored = 0
+    if source == target:
+        return []
+
+    parents = {source: None}
+    seen_movies = set()
+
+    def unseen_costars(person):
+        for movie in movies_of(person):
+            if movie in seen_movies:
+                continue
+            seen_movies.add(movie)
+            for costar in stars_of(movie):
+                yield movie, costar
+
+    frontier = deque([source])
+    while frontier:
+        person = frontier.popleft()
+        num_explored += 1
+        for movie, costar in unseen_costars(person):
+            if costar in parents:
+                continue
+            parents[costar] = (movie, person)
+            # Goal test on generation is safe since every step costs one
+            if costar == target:
+                return trace(parents, target)
+            frontier.append(costar)
+    return None
+
+
+def breadth_first_tree(source, movies_of, stars_of, targets=None):
+    """
+    Returns the BFS parents map of everyone reachable from source, stopping
+    early once every person in targets has been reached. Each movie is
+    expanded at most once, as in movie_search.
+    """
+    global num_explored
+    num_explored = 0
+    parents = {source: None}
+    remaining = None if targets is None else set(targets) - {source}
+    seen_movies = set()
+    frontier = deque([source])
+    while frontier and remaining != set():
+        person = frontier.popleft()
+        num_explored += 1
+        for movie in movies_of(person):
+            if movie in seen_movies:
+                continue
+            seen_movies.add(movie)
+            for costar in stars_of(movie):
+                if costar not in parents:
+                    parents[costar] = (movie, person)
+                    frontier.append(costar)
+                    if remaining is not None:
+                        remaining.discard(costar)
+    return parents
+
+
+def join(forward, backward, meeting):
+    """
+    Returns the path through meeting given forward and backward parent maps.
+    """
+    path = trace(forward, meeting)
+    state = meeting
+    while backward[state] is not None:
+        action, state = backward[state]
+        path.append((action, state))
+    return path
+
+
+# Search engines selectable by name
+SEARCHES = {
+    "bfs": breadth_first_search,
+    "bidirectional": bidirectional_search,
+    "movies": movie_search,
+}
@@ -0,0 +1,187 @@
+"""
+Long-running degrees query server.
+
+Usage: python server.py [directory] [--port PORT] [--workers N]
+                         [--cache SIZE] [--cache-ttl SECONDS]
+
+The graph snapshot is compiled once and then memory-mapped read-only by a
+pool of worker processes, so every worker shares the same physical pages and
+throughput scales with cores. Queries are served over localhost HTTP:
+
+    GET /person?name=Kevin+Bacon
+        {"people": [{"id": "102", "name": "Kevin Bacon", "birth": "1958"}]}
+    GET /path?source=102&target=129[&method=bidirectional]
+        {"degrees": 1, "path": [["104257", "129"]],
+         "names": ["Kevin Bacon", "Tom Cruise"], "titles": ["A Few Good Men"]}
+
+Missing parameters and unknown methods are answered with status 400, and
+names or ids of unknown people with 404.
+
+With --cache, each worker keeps an LRU cache of the paths it has found.
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+from graph import Graph
+from search import SEARCHES
+
+# Pool of worker processes, created by serve
+pool = None
+
+
+def init_worker(directory, cache_size, cache_ttl):
+    """
+    Maps the snapshot of directory in a worker process and sets up its
+    path cache.
+    """
+    degrees.load_graph(directory)
+    if cache_size:
+        degrees.enable_cache(cache_size, cache_ttl)
+
+
+def find_people(name):
+    """
+    Returns a list of people with the given name.
+    """
+    people = []
+    for person_id in sorted(degrees.names.get(name.lower(), set())):
+        person = degrees.people[person_id]
+        people.append({
+            "id": person_id,
+            "name": person["name"],
+            "birth": person["birth"],
+        })
+    return people
+
+
+def find_path(source, target, method):
+    """
+    Returns the reply for the shortest path between two person ids, with
+    the names of the people and titles of the movies along it.
+    """
+    path = degrees.shortest_path(source, target, method)
+    if path is None:
+        return {"degrees": None, "path": None}
+    return {
+        "degrees": len(path),
+        "path": path,
+        "names": [degrees.people[person_id]["name"]
+                  for person_id in [source] + [step[1] for step in path]],
+        "titles": [degrees.movies[movie_id]["title"] for movie_id, _ in path],
+    }
+
+
+# Parameters each endpoint requires
+PARAMETERS = {
+    "/person": ["name"],
+    "/path": ["source", "target"],
+}
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path not in PARAMETERS:
+            self.reply(404, {"error": "not found"})
+            return
+        for key in PARAMETERS[url.path]:
+            if key not in query:
+                self.reply(400, {"error": f"missing parameter {key}"})
+                return
+
+        if url.path == "/person":
+            people = pool.submit(find_people, query["name"]).result()
+            if people:
+                self.reply(200, {"people": people})
+            else:
+                name = query["name"]
+                self.reply(404, {"error": f"unknown person {name}"})
+            return
+
+        method = query.get("method", "bfs")
+        if method not in SEARCHES:
+            self.reply(400, {"error": f"unknown method {method}"})
+            return
+        try:
+            reply = pool.submit(
+                find_path, query["source"], query["target"], method
+            ).result()
+        except KeyError as e:
+            self.reply(404, {"error": f"unknown person {e.args[0]}"})
+            return
+        self.reply(200, reply)
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Per-request logging would dominate latency under load
+        pass
+
+
+def make_server(directory, host, port, workers, cache_size=0,
+                cache_ttl=None):
+    """
+    Returns a server for queries on host:port, answered by a pool of
+    workers sharing the snapshot of directory. Each worker caches up to
+    cache_size paths.
+    """
+    global pool
+
+    # Compile the snapshot once so workers only have to map it
+    Graph.load(directory)
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(directory, cache_size, cache_ttl),
+    )
+    return ThreadingHTTPServer((host, port), RequestHandler)
+
+
+def serve(directory, host, port, workers, cache_size=0, cache_ttl=None):
+    """
+    Serves queries with make_server until interrupted.
+    """
+    server = make_server(directory, host, port, workers, cache_size,
+                         cache_ttl)
+    print(f"Serving {directory} on http://{host}:{port} "
+          f"with {workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Degrees query server")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--cache", type=int, default=0,
+                        help="paths cached per worker, 0 to disable")
+    parser.add_argument("--cache-ttl", type=float,
+                        help="seconds a cached path stays valid")
+    args = parser.parse_args()
+    serve(args.directory, args.host, args.port, args.workers,
+          args.cache, args.cache_ttl)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+import degrees
+import loader
+import server
+from cache import MISS, PathCache
+from paths import PathDAG
+from graph import Graph, SNAPSHOT
+from util import Node, HashedQueueFrontier, HashedStackFrontier
+
+DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small")
+
+KEVIN_BACON = "102"
+TOM_CRUISE = "129"
+CARY_ELWES = "144"
+EMMA_WATSON = "914612"
+TOM_HANKS = "158"
+
+
+def write_delta(directory):
+    """
+    Writes a delta that connects Emma Watson, disconnects Tom Cruise and
+    adds a new person to Apollo 13.
+    """
+    with open(os.path.join(directory, "people.csv"), "w") as f:
+        f.write('op,id,name,birth\n+,1,"New Person",2000\n')
+    with open(os.path.join(directory, "stars.csv"), "w") as f:
+        f.write(f"op,person_id,movie_id\n+,{EMMA_WATSON},109830\n"
+                f"+,1,112384\n-,{TOM_CRUISE},104257\n")
+
+
+def check_delta(test, changes):
+    """
+    Checks the data after applying the delta written by write_delta.
+    """
+    if changes is not None:
+        test.assertIn((TOM_CRUISE, "104257"), changes.removed_credits)
+        test.assertIn((KEVIN_BACON, TOM_CRUISE), changes.removed_links)
+    test.assertEqual(degrees.names.get("new person"), {"1"})
+    test.assertEqual(degrees.people["1"]["movies"], {"112384"})
+    test.assertNotIn(TOM_CRUISE, degrees.movies["104257"]["stars"])
+    test.assertEqual(len(degrees.shortest_path(EMMA_WATSON, KEVIN_BACON)), 2)
+    test.assertEqual(len(degrees.shortest_path("1", CARY_ELWES)), 3)
+    test.assertIsNone(degrees.shortest_path(TOM_CRUISE, KEVIN_BACON))
+
+
+def is_valid_path(source, target, path):
+    """
+    Returns True if path is a chain of co-star links from source to target.
+    """
+    person = source
+    for movie_id, person_id in path:
+        if person not in degrees.movies[movie_id]["stars"]:
+            return False
+        if person_id not in degrees.movies[movie_id]["stars"]:
+            return False
+        person = person_id
+    return person == target
+
+
+class TestDegreesMethods(unittest.TestCase):
+
+    def setUp(self):
+        degrees.graph = None
+        degrees.cache = None
+        degrees.names, degrees.people, degrees.movies = {}, {}, {}
+        degrees.load_data(DIRECTORY)
+
+    def test_shortest_path(self):
+        path = degrees.shortest_path(CARY_ELWES, KEVIN_BACON)
+        self.assertEqual(len(path), 3)
+        self.assertTrue(is_valid_path(CARY_ELWES, KEVIN_BACON, path))
+
+        path = degrees.shortest_path(TOM_CRUISE, KEVIN_BACON)
+        self.assertEqual(path, [("104257", KEVIN_BACON)])
+
+        self.assertEqual(degrees.shortest_path(KEVIN_BACON, KEVIN_BACON), [])
+        self.assertIsNone(degrees.shortest_path(EMMA_WATSON, KEVIN_BACON))
+
+    def test_methods(self):
+        for method in ("bidirectional", "movies"):
+            for source in degrees.people:
+                for target in degrees.people:
+                    expected = degrees.shortest_path(source, target)
+                    path = degrees.shortest_path(source, target, method)
+                    if expected is None:
+                        self.assertIsNone(path)
+                    else:
+                        self.assertEqual(len(path), len(expected))
+                        self.assertTrue(is_valid_path(source, target, path))
+
+    def test_shortest_paths_from(self):
+        paths = degrees.shortest_paths_from(
+            CARY_ELWES, {KEVIN_BACON, TOM_CRUISE, EMMA_WATSON, CARY_ELWES})
+        self.assertEqual(len(paths[KEVIN_BACON]), 3)
+        self.assertEqual(len(paths[TOM_CRUISE]), 4)
+        self.assertTrue(is_valid_path(CARY_ELWES, TOM_CRUISE, paths[TOM_CRUISE]))
+        self.assertIsNone(paths[EMMA_WATSON])
+        self.assertEqual(paths[CARY_ELWES], [])
+
+    def test_parallel_loader(self):
+        expected = (degrees.names, degrees.people, degrees.movies)
+        names, people, movies = {}, {}, {}
+        progress = []
+        loader.load_data(DIRECTORY, names, people, movies, workers=2,
+                         progress=lambda *args: progress.append(args),
+                         chunk_size=64)
+        self.assertEqual((names, people, movies), expected)
+        self.assertEqual(progress[-1][0], "stars.csv")
+        self.assertEqual(progress[-1][1], progress[-1][2])
+
+    def test_apply_delta(self):
+        directory = tempfile.mkdtemp()
+        write_delta(directory)
+        try:
+            changes = degrees.apply_delta(directory)
+        finally:
+            shutil.rmtree(directory)
+        check_delta(self, changes)
+
+    def test_cache(self):
+        cache = degrees.enable_cache(maxsize=2)
+        path = degrees.shortest_path(CARY_ELWES, KEVIN_BACON)
+        reverse = degrees.shortest_path(KEVIN_BACON, CARY_ELWES)
+        self.assertTrue(is_valid_path(KEVIN_BACON, CARY_ELWES, reverse))
+        self.assertEqual(degrees.shortest_path(CARY_ELWES, KEVIN_BACON), path)
+        self.assertIsNone(degrees.shortest_path(EMMA_WATSON, KEVIN_BACON))
+        self.assertIsNone(degrees.shortest_path(KEVIN_BACON, EMMA_WATSON))
+        degrees.shortest_path(TOM_CRUISE, KEVIN_BACON)
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (3, 3, 1))
+
+        # Removing Tom Cruise's credit drops only paths that use it, and
+        # adding credits drops unconnected pairs and longer paths
+        degrees.enable_cache()
+        degrees.shortest_path(TOM_CRUISE, KEVIN_BACON)
+        degrees.shortest_path(EMMA_WATSON, KEVIN_BACON)
+        degrees.shortest_path(CARY_ELWES, KEVIN_BACON)
+        degrees.shortest_path(TOM_HANKS, KEVIN_BACON)
+        directory = tempfile.mkdtemp()
+        write_delta(directory)
+        try:
+            degrees.apply_delta(directory)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(list(degrees.cache.entries), [(KEVIN_BACON, TOM_HANKS)])
+        check_delta(self, None)
+
+    def test_all_shortest_paths(self):
+        paths = list(degrees.all_shortest_paths(CARY_ELWES, KEVIN_BACON))
+        self.assertEqual(len(paths), 2)
+        self.assertEqual(len({tuple(path) for path in paths}), 2)
+        for path in paths:
+            self.assertEqual(len(path), 3)
+            self.assertTrue(is_valid_path(CARY_ELWES, KEVIN_BACON, path))
+        self.assertEqual(
+            degrees.count_shortest_paths(CARY_ELWES, KEVIN_BACON), 2)
+        self.assertEqual(degrees.count_shortest_paths(EMMA_WATSON, KEVIN_BACON), 0)
+        self.assertEqual(list(degrees.all_shortest_paths(KEVIN_BACON, KEVIN_BACON)), [[]])
+
+        top = degrees.top_shortest_paths(TOM_CRUISE, KEVIN_BACON, by="popularity")
+        self.assertEqual(top, [(4, [("104257", KEVIN_BACON)])])
+
+    def test_path_dag(self):
+        # Two ways from 0 to 3 through each of 1 and 2, movies weighted by id
+        stars = {10: {0, 1}, 11: {0, 1}, 12: {0, 2}, 13: {1, 3}, 14: {2, 3}}
+        movies = {}
+        for movie, people in stars.items():
+            for person in people:
+                movies.setdefault(person, set()).add(movie)
+        dag = PathDAG.build(0, 3, movies.get, stars.get)
+        self.assertEqual(dag.degrees, 2)
+        self.assertEqual(dag.count(), 3)
+        self.assertEqual(len(list(dag.paths())), 3)
+        self.assertEqual(dag.top(2, lambda movie: movie), [
+            (26, [(12, 2), (14, 3)]),
+            (24, [(11, 1), (13, 3)]),
+        ])
+
+    def test_cache_ttl(self):
+        now = [0]
+        cache = PathCache(ttl=10, clock=lambda: now[0])
+        cache.put("1", "2", [("10", "2")])
+        self.assertEqual(cache.get("2", "1"), [("10", "1")])
+        now[0] = 10
+        self.assertIs(cache.get("1", "2"), MISS)
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+
+class TestFrontierMethods(unittest.TestCase):
+
+    def test_hashed_frontiers(self):
+        queue, stack = HashedQueueFrontier(), HashedStackFrontier()
+        for frontier in (queue, stack):
+            for state in ("a", "b", "a"):
+                frontier.add(Node(state=state, parent=None, action=None))
+            self.assertTrue(frontier.contains_state("b"))
+        self.assertEqual(queue.remove().state, "a")
+        self.assertEqual(stack.remove().state, "a")
+        self.assertTrue(queue.contains_state("a"))
+        self.assertTrue(stack.contains_state("a"))
+        self.assertEqual(queue.remove().state, "b")
+        self.assertEqual(queue.remove().state, "a")
+        self.assertFalse(queue.contains_state("a"))
+        self.assertTrue(queue.empty())
+        self.assertRaises(Exception, queue.remove)
+
+
+class TestGraphMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name in ("people.csv", "movies.csv", "stars.csv"):
+            shutil.copy(os.path.join(DIRECTORY, name), self.directory)
+        degrees.cache = None
+        degrees.names, degrees.people, degrees.movies = {}, {}, {}
+        degrees.load_data(DIRECTORY)
+        self.dicts = (degrees.names, degrees.people, degrees.movies)
+        degrees.load_graph(self.directory)
+
+    def tearDown(self):
+        degrees.graph = None
+        shutil.rmtree(self.directory)
+
+    def test_snapshot(self):
+        self.assertTrue(os.path.exists(os.path.join(self.directory, SNAPSHOT)))
+        graph = Graph.open(os.path.join(self.directory, SNAPSHOT))
+        self.assertEqual(graph.n_people, 16)
+        self.assertEqual(graph.n_movies, 5)
+
+    def test_views(self):
+        names, people, movies = self.dicts
+        self.assertEqual(dict(degrees.people), people)
+        self.assertEqual(dict(degrees.movies), movies)
+        self.assertEqual(degrees.names.get("kevin bacon"), {KEVIN_BACON})
+        self.assertIsNone(degrees.names.get("nobody"))
+        self.assertEqual(set(degrees.names), set(names))
+
+    def test_neighbors_for_person(self):
+        for person_id in self.dicts[1]:
+            degrees.graph, graph = None, degrees.graph
+            degrees.names, degrees.people, degrees.movies = self.dicts
+            expected = degrees.neighbors_for_person(person_id)
+            degrees.graph = graph
+            self.assertEqual(degrees.neighbors_for_person(person_id), expected)
+
+    def test_shortest_path(self):
+        path = degrees.shortest_path(CARY_ELWES, KEVIN_BACON)
+        self.assertEqual(len(path), 3)
+        self.assertTrue(is_valid_path(CARY_ELWES, KEVIN_BACON, path))
+        self.assertEqual(degrees.shortest_path(KEVIN_BACON, KEVIN_BACON), [])
+        self.assertIsNone(degrees.shortest_path(EMMA_WATSON, KEVIN_BACON))
+
+        for method in ("bidirectional", "movies"):
+            path = degrees.shortest_path(CARY_ELWES, TOM_CRUISE, method)
+            self.assertEqual(len(path), 4)
+            self.assertTrue(is_valid_path(CARY_ELWES, TOM_CRUISE, path))
+
+        paths = degrees.shortest_paths_from(KEVIN_BACON, {CARY_ELWES})
+        self.assertEqual(len(paths[CARY_ELWES]), 3)
+
+    def test_all_shortest_paths(self):
+        for source in (CARY_ELWES, TOM_CRUISE, EMMA_WATSON):
+            degrees.graph = None
+            degrees.names, degrees.people, degrees.movies = self.dicts
+            expected = sorted(degrees.all_shortest_paths(source, KEVIN_BACON))
+            degrees.load_graph(self.directory)
+            graph_paths = sorted(degrees.all_shortest_paths(source, KEVIN_BACON))
+            self.assertEqual(graph_paths, expected)
+            self.assertEqual(
+                degrees.count_shortest_paths(source, KEVIN_BACON), len(expected))
+
+    def test_landmarks(self):
+        degrees.load_landmarks(self.directory, count=2)
+        for source in self.dicts[1]:
+            for target in self.dicts[1]:
+                path = degrees.shortest_path(source, target, "bidirectional")
+                lower, upper = degrees.degree_bounds(source, target)
+                exact = math.inf if path is None else len(path)
+                self.assertLessEqual(lower, exact)
+                self.assertGreaterEqual(upper, exact)
+                self.assertEqual(
+                    degrees.degrees_of_separation(source, target),
+                    None if path is None else len(path))
+                alt = degrees.shortest_path(source, target, "landmarks")
+                if path is None:
+                    self.assertIsNone(alt)
+                else:
+                    self.assertEqual(len(alt), len(path))
+                    self.assertTrue(is_valid_path(source, target, alt))
+
+    def test_apply_delta(self):
+        degrees.load_landmarks(self.directory, count=4)
+        directory = os.path.join(self.directory, "delta")
+        os.mkdir(directory)
+        write_delta(directory)
+        changes = degrees.apply_delta(directory)
+        check_delta(self, changes)
+        self.assertIsNone(
+            degrees.shortest_path(TOM_CRUISE, KEVIN_BACON, "landmarks"))
+        self.assertEqual(len(degrees.shortest_path(
+            EMMA_WATSON, KEVIN_BACON, "landmarks")), 2)
+
+    def test_landmarks_after_delta(self):
+        directory = os.path.join(self.directory, "delta")
+        os.mkdir(directory)
+        write_delta(directory)
+        degrees.apply_delta(directory)
+        degrees.load_landmarks(self.directory, count=4)
+        self.assertEqual(degrees.graph.landmarks.n_people, 17)
+        people = list(self.dicts[1]) + ["1"]
+        for source in people:
+            for target in people:
+                path = degrees.shortest_path(source, target, "bidirectional")
+                lower, upper = degrees.degree_bounds(source, target)
+                exact = math.inf if path is None else len(path)
+                self.assertLessEqual(lower, exact)
+                self.assertGreaterEqual(upper, exact)
+                alt = degrees.shortest_path(source, target, "landmarks")
+                self.assertEqual(alt is None, path is None)
+                if path is not None:
+                    self.assertEqual(len(alt), len(path))
+
+
+class TestServerMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name in ("people.csv", "movies.csv", "stars.csv"):
+            shutil.copy(os.path.join(DIRECTORY, name), self.directory)
+        # Port 0 lets the system pick a free port
+        self.server = server.make_server(self.directory, "127.0.0.1", 0, 1)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        server.pool.shutdown()
+        shutil.rmtree(self.directory)
+
+    def get(self, path, **params):
+        """Returns the status and JSON reply of a request to the server."""
+        try:
+            with urlopen(f"{self.url}{path}?{urlencode(params)}") as response:
+                return response.status, json.load(response)
+        except HTTPError as e:
+            return e.code, json.load(e)
+
+    def test_path(self):
+        status, reply = self.get("/path", source=KEVIN_BACON,
+                                 target=TOM_CRUISE, method="bidirectional")
+        self.assertEqual(status, 200)
+        self.assertEqual(reply["degrees"], 1)
+        self.assertEqual(reply["names"], ["Kevin Bacon", "Tom Cruise"])
+
+    def test_missing_parameter(self):
+        status, reply = self.get("/path", source=KEVIN_BACON)
+        self.assertEqual(status, 400)
+        self.assertEqual(reply["error"], "missing parameter target")
+        self.assertEqual(self.get("/person")[0], 400)
+
+    def test_unknown_person(self):
+        self.assertEqual(self.get("/person", name="Nobody")[0], 404)
+        status, reply = self.get("/path", source=KEVIN_BACON, target="0")
+        self.assertEqual(status, 404)
+        self.assertEqual(reply["error"], "unknown person 0")
+
+    def test_unknown_method(self):
+        status, _ = self.get("/path", source=KEVIN_BACON,
+                             target=TOM_CRUISE, method="dijkstra")
+        self.assertEqual(status, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,6 @@
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -36,3 +39,48 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class HashedStackFrontier():
+    """
+    Stack frontier backed by a deque, with a companion count of the states
+    it holds so contains_state is O(1) instead of a linear scan.
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def pop(self):
+        return self.frontier.pop()
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.pop()
+            count = self.states[node.state] - 1
+            if count:
+                self.states[node.state] = count
+            else:
+                del self.states[node.state]
+            return node
+
+
+class HashedQueueFrontier(HashedStackFrontier):
+    """
+    Queue frontier with O(1) dequeue and O(1) contains_state.
+    """
+
+    def pop(self):
+        return self.frontier.popleft()
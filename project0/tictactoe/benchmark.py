@@ -0,0 +1,82 @@
+"""
+Tic Tac Toe search benchmark
+
+Usage: python benchmark.py [--min-marks N]
+
+Scores every reachable, unfinished position with at least N marks using both
+the exhaustive search and the alpha-beta search of tictactoe, checks they
+agree, and reports nodes visited and wall time grouped by number of marks.
+"""
+
+import argparse
+import time
+
+import tictactoe as ttt
+from helper import count_value
+
+def reachable_positions():
+    """
+    Returns every unfinished position reachable from the initial state.
+    """
+    positions = {}
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        key = tuple(map(tuple, board))
+        if key in positions or ttt.terminal(board):
+            continue
+        positions[key] = board
+        for action in ttt.actions(board):
+            stack.append(ttt.result(board, action))
+    return list(positions.values())
+
+def measure(search, board):
+    """
+    Returns (score, nodes visited, seconds) of one search of a board.
+    """
+    ttt.nodes_visited = 0
+    start = time.perf_counter()
+    score = search(board)
+    return score, ttt.nodes_visited, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Tic Tac Toe search benchmark")
+    parser.add_argument("--min-marks", type=int, default=0,
+                        help="skip positions with fewer marks on the board")
+    args = parser.parse_args()
+
+    # Totals of [positions, nodes, seconds, nodes, seconds] per mark count
+    rows = {}
+    for board in reachable_positions():
+        marks = 9 - count_value(board, ttt.EMPTY)
+        if marks < args.min_marks:
+            continue
+        full_score, full_nodes, full_seconds = measure(
+            ttt.get_best_score_exhaustive, board)
+        score, nodes, seconds = measure(ttt.get_best_score, board)
+        if score != full_score:
+            raise AssertionError(f"alpha-beta scored {board} {score}, "
+                                 f"not {full_score}")
+        row = rows.setdefault(marks, [0, 0, 0.0, 0, 0.0])
+        row[0] += 1
+        row[1] += full_nodes
+        row[2] += full_seconds
+        row[3] += nodes
+        row[4] += seconds
+
+    print(f"{'marks':>5} {'positions':>9} {'exhaustive nodes':>16} "
+          f"{'time':>8} {'alpha-beta nodes':>16} {'time':>8} {'speedup':>7}")
+    totals = [0, 0, 0.0, 0, 0.0]
+    for marks in sorted(rows):
+        row = rows[marks]
+        totals = [total + value for total, value in zip(totals, row)]
+        print_row(str(marks), row)
+    print_row("all", totals)
+
+def print_row(label, row):
+    positions, full_nodes, full_seconds, nodes, seconds = row
+    print(f"{label:>5} {positions:>9} {full_nodes:>16} {full_seconds:>7.2f}s "
+          f"{nodes:>16} {seconds:>7.2f}s {full_seconds / seconds:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Bitboard Tic Tac Toe engine
+
+The board is held as two 9-bit integers, one per player, with cell (i, j)
+at bit 3 * i + j. Wins are looked up in a table precomputed from the winning
+position sets, and minimax values are memoized in a transposition table, so
+solving the empty board visits each reachable position once.
+
+minimax(board) takes the same nested-list boards as tictactoe.minimax.
+"""
+
+from helper import get_winning_position_sets
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Bits of a full board
+FULL = (1 << 9) - 1
+
+# One mask per winning line
+WIN_MASKS = tuple(
+    sum(1 << (3 * i + j) for i, j in win_set)
+    for win_set in get_winning_position_sets()
+)
+
+# WINNING[bits] is 1 if the cells in bits contain a winning line
+WINNING = bytes(
+    any(bits & mask == mask for mask in WIN_MASKS) for bits in range(FULL + 1)
+)
+
+# Minimax value of every position solved so far, keyed by x | o << 9
+TABLE = {}
+
+def from_board(board):
+    """
+    Returns the (x, o) bitboards of a nested-list board.
+    """
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (3 * i + j)
+            elif cell == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+def to_board(x, o):
+    """
+    Returns the nested-list board of (x, o) bitboards.
+    """
+    return [
+        [X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1 else EMPTY
+         for j in range(3)]
+        for i in range(3)
+    ]
+
+def x_to_move(x, o):
+    """
+    Returns True if X has the next turn, which like tictactoe.player is
+    whenever X does not have more marks than O.
+    """
+    return bin(x).count("1") <= bin(o).count("1")
+
+def winner(x, o):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    if WINNING[x]:
+        return X
+    if WINNING[o]:
+        return O
+    return None
+
+def terminal(x, o):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return bool(WINNING[x] or WINNING[o]) or x | o == FULL
+
+def moves(x, o):
+    """
+    Returns the bits of the empty cells, lowest first.
+    """
+    empty = FULL & ~(x | o)
+    return [1 << i for i in range(9) if empty >> i & 1]
+
+def value(x, o):
+    """
+    Returns 1 if X wins with perfect play from a position, -1 if O does,
+    0 for a tie.
+    """
+    key = x | o << 9
+    score = TABLE.get(key)
+    if score is not None:
+        return score
+    if WINNING[x]:
+        score = 1
+    elif WINNING[o]:
+        score = -1
+    elif x | o == FULL:
+        score = 0
+    elif x_to_move(x, o):
+        score = -1
+        for move in moves(x, o):
+            score = max(score, value(x | move, o))
+            # Nothing beats a win
+            if score == 1:
+                break
+    else:
+        score = 1
+        for move in moves(x, o):
+            score = min(score, value(x, o | move))
+            if score == -1:
+                break
+    TABLE[key] = score
+    return score
+
+def best_move(x, o):
+    """
+    Returns the bit of the optimal move for the current player, or None if
+    the game is over.
+    """
+    if terminal(x, o):
+        return None
+    if x_to_move(x, o):
+        return max(moves(x, o), key=lambda move: value(x | move, o))
+    return min(moves(x, o), key=lambda move: value(x, o | move))
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    move = best_move(*from_board(board))
+    if move is None:
+        return None
+    return divmod(move.bit_length() - 1, 3)
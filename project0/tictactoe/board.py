@@ -0,0 +1,152 @@
+"""
+Immutable Tic Tac Toe board
+
+A Board holds the X and O bitboards of a position, laid out as in
+bitboard.py, and is hashable so positions can be dict keys. Making a move
+returns a new Board instead of copying nested lists. Boards index and
+iterate like the nested-list boards, one tuple per row, so the functions in
+tictactoe and helper accept either.
+"""
+
+from bitboard import FULL, WINNING
+
+X = "X"
+O = "O"
+EMPTY = None
+
+class Board():
+    """
+    An immutable 3x3 board.
+    """
+
+    __slots__ = ("x", "o")
+
+    def __init__(self, x=0, o=0):
+        if x & o or (x | o) & ~FULL:
+            raise ValueError("X and O must occupy distinct cells")
+        object.__setattr__(self, "x", x)
+        object.__setattr__(self, "o", o)
+
+    @classmethod
+    def from_lists(cls, board):
+        """
+        Returns the Board of a nested-list board.
+        """
+        x = o = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell == X:
+                    x |= 1 << (3 * i + j)
+                elif cell == O:
+                    o |= 1 << (3 * i + j)
+        return cls(x, o)
+
+    def to_lists(self):
+        """
+        Returns the board as nested lists.
+        """
+        return [list(row) for row in self]
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Board is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Board is immutable")
+
+    def __eq__(self, other):
+        if isinstance(other, Board):
+            return self.x == other.x and self.o == other.o
+        if isinstance(other, list):
+            return self.to_lists() == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.x, self.o))
+
+    def __repr__(self):
+        return f"Board({self.to_lists()})"
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, i):
+        if not -3 <= i < 3:
+            raise IndexError("board row out of range")
+        i %= 3
+        return tuple(self.cell(i, j) for j in range(3))
+
+    def __iter__(self):
+        for i in range(3):
+            yield self[i]
+
+    def cell(self, i, j):
+        """
+        Returns X, O or EMPTY at (i, j).
+        """
+        bit = 1 << (3 * i + j)
+        if self.x & bit:
+            return X
+        if self.o & bit:
+            return O
+        return EMPTY
+
+    def winner(self):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        if WINNING[self.x]:
+            return X
+        if WINNING[self.o]:
+            return O
+        return None
+
+    def terminal(self):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return bool(WINNING[self.x] or WINNING[self.o]) or self.x | self.o == FULL
+
+    def utility(self):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        if WINNING[self.x]:
+            return 1
+        if WINNING[self.o]:
+            return -1
+        return 0
+
+    def player(self):
+        """
+        Returns player who has the next turn, or None if the game is over.
+        """
+        if self.terminal():
+            return None
+        if bin(self.x).count("1") <= bin(self.o).count("1"):
+            return X
+        return O
+
+    def actions(self):
+        """
+        Returns set of all possible actions (i, j), or None if the game is
+        over.
+        """
+        if self.terminal():
+            return None
+        empty = FULL & ~(self.x | self.o)
+        return {divmod(cell, 3) for cell in range(9) if empty >> cell & 1}
+
+    def move(self, action):
+        """
+        Returns the board that results from the current player making move
+        (i, j).
+        """
+        i, j = action
+        if not (0 <= i < 3 and 0 <= j < 3):
+            raise ValueError('This move is illegal.')
+        bit = 1 << (3 * i + j)
+        if (self.x | self.o) & bit:
+            raise ValueError('This move is illegal.')
+        if bin(self.x).count("1") <= bin(self.o).count("1"):
+            return Board(self.x | bit, self.o)
+        return Board(self.x, self.o | bit)
@@ -0,0 +1,152 @@
+"""
+Tic Tac Toe opening book
+
+Usage: python book.py
+
+Every reachable position is solved once with the bitboard engine and stored
+under its canonical form, the smallest of its 8 rotations and reflections,
+with its minimax value and optimal move. The table file holds one key and
+one byte per canonical position, so looking up a move is a dict access
+after trying the 8 symmetries.
+"""
+
+import os
+from array import array
+
+import bitboard
+
+# Default location of the table file, next to this module
+BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+MAGIC = b"TTTBOOK1"
+
+def symmetries():
+    """
+    Returns the 8 symmetries of the board as lists mapping each cell index
+    to the index it moves to.
+    """
+    cells = [(i, j) for i in range(3) for j in range(3)]
+    result = []
+    for reflect in (False, True):
+        for turns in range(4):
+            permutation = []
+            for i, j in cells:
+                if reflect:
+                    j = 2 - j
+                for _ in range(turns):
+                    i, j = j, 2 - i
+                permutation.append(3 * i + j)
+            result.append(permutation)
+    return result
+
+SYMMETRIES = symmetries()
+
+# TRANSFORMS[s][bits] is the bitboard bits under symmetry s
+TRANSFORMS = [
+    array("H", [
+        sum(1 << permutation[i] for i in range(9) if bits >> i & 1)
+        for bits in range(bitboard.FULL + 1)
+    ])
+    for permutation in SYMMETRIES
+]
+
+def canonical(x, o):
+    """
+    Returns (key, s) where key is the smallest x | o << 9 key of a position
+    under any symmetry, and s is that symmetry.
+    """
+    return min(
+        (transform[x] | transform[o] << 9, s)
+        for s, transform in enumerate(TRANSFORMS)
+    )
+
+class Book():
+    """
+    Minimax value and optimal move of every reachable unfinished position,
+    keyed by canonical position.
+    """
+
+    def __init__(self, entries):
+        # Maps keys to value + 1 in the high bits and move cell in the low
+        self.entries = entries
+
+    @classmethod
+    def build(cls):
+        """
+        Solves every reachable unfinished position.
+        """
+        entries = {}
+        stack = [(0, 0)]
+        while stack:
+            x, o = stack.pop()
+            if bitboard.terminal(x, o):
+                continue
+            key, s = canonical(x, o)
+            if key in entries:
+                continue
+            move = bitboard.best_move(x, o)
+            cell = SYMMETRIES[s][move.bit_length() - 1]
+            entries[key] = (bitboard.value(x, o) + 1) << 4 | cell
+            for move in bitboard.moves(x, o):
+                if bitboard.x_to_move(x, o):
+                    stack.append((x | move, o))
+                else:
+                    stack.append((x, o | move))
+        return cls(entries)
+
+    def save(self, path=BOOK):
+        """
+        Writes the table to path.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            array("I", [len(self.entries)]).tofile(f)
+            array("I", self.entries.keys()).tofile(f)
+            array("B", self.entries.values()).tofile(f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def open(cls, path=BOOK):
+        """
+        Reads the table at path.
+        """
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not an opening book")
+            count = array("I")
+            count.fromfile(f, 1)
+            keys, values = array("I"), array("B")
+            keys.fromfile(f, count[0])
+            values.fromfile(f, count[0])
+        return cls(dict(zip(keys, values)))
+
+    @classmethod
+    def load(cls, path=BOOK):
+        """
+        Returns the table at path, building and saving it first if missing.
+        """
+        if not os.path.exists(path):
+            cls.build().save(path)
+        return cls.open(path)
+
+    def lookup(self, board):
+        """
+        Returns (value, action) for a nested-list board, or None if the
+        position is finished or not reachable in play.
+        """
+        key, s = canonical(*bitboard.from_board(board))
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        cell = SYMMETRIES[s].index(entry & 0xF)
+        return (entry >> 4) - 1, divmod(cell, 3)
+
+def main():
+    book = Book.build()
+    book.save()
+    print(f"Stored {len(book.entries)} canonical positions in {BOOK} "
+          f"({os.path.getsize(BOOK)} bytes)")
+
+if __name__ == "__main__":
+    main()
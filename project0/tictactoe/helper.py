@@ -19,18 +19,17 @@ def get_positions_of_value(board, value):
                 positions.add(position)
     return positions
 
-def get_winning_position_sets():
-    return (
-        # Full rows
-        {(0, 0), (0, 1), (0, 2)},
-        {(1, 0), (1, 1), (1, 2)},
-        {(2, 0), (2, 1), (2, 2)},
-        # Full columns
-        {(0, 0), (1, 0), (2, 0)},
-        {(0, 1), (1, 1), (2, 1)},
-        {(0, 2), (1, 2), (2, 2)},
-        # Diagonal
-        {(0, 0), (1, 1), (2, 2)},
-        # Alt-diagonal
-        {(0, 2), (1, 1), (2, 0)}
-    )
+def get_winning_position_sets(rows=3, cols=3, k=3):
+    # Every run of k cells in a line on a rows x cols board
+    runs = []
+    for i in range(rows):
+        for j in range(cols):
+            for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                if 0 <= end_i < rows and 0 <= end_j < cols:
+                    runs.append(((di, dj), {(i + di * n, j + dj * n)
+                                            for n in range(k)}))
+    # Full rows, full columns, diagonals, then alt-diagonals
+    order = [(0, 1), (1, 0), (1, 1), (1, -1)]
+    runs.sort(key=lambda run: order.index(run[0]))
+    return tuple(positions for _, positions in runs)
@@ -0,0 +1,283 @@
+"""
+m,n,k Tic Tac Toe
+
+Players take turns on a rows x cols board and the first to get k in a row
+wins, so Tic Tac Toe is the 3,3,3 game. Beyond 3x3 the game tree is too big
+to solve on every move, so Game.minimax runs an iterative-deepening
+alpha-beta search until a per-move time budget runs out, scoring the
+positions where it stops with a heuristic, and plays the best move of the
+deepest search it completed.
+
+Boards are nested lists like those of tictactoe, held internally as one
+bitboard per player with cell (i, j) at bit i * cols + j.
+"""
+
+import math
+import time
+
+from helper import get_winning_position_sets
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a win, less the number of moves it takes
+WIN_SCORE = 1000000
+
+# Scores beyond this are wins or losses, not heuristic estimates
+WIN_THRESHOLD = WIN_SCORE // 2
+
+# Bound types of transposition table scores
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Transposition table entries kept before it is cleared
+MAX_TABLE = 1000000
+
+class Timeout(Exception):
+    """
+    Raised inside a search when its deadline has passed.
+    """
+
+class Game():
+    """
+    An m,n,k game with its win lines, and the search state of its AI.
+    """
+
+    def __init__(self, rows=3, cols=3, k=3):
+        if not 1 <= k <= max(rows, cols):
+            raise ValueError(f"{k} in a row does not fit a {rows}x{cols} board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.size = rows * cols
+        self.full = (1 << self.size) - 1
+
+        self.lines = [
+            sum(1 << (i * cols + j) for i, j in win_set)
+            for win_set in get_winning_position_sets(rows, cols, k)
+        ]
+        self.lines_through = [
+            [line for line in self.lines if line >> cell & 1]
+            for cell in range(self.size)
+        ]
+        # Try central cells first, as they lie on the most lines
+        self.order = sorted(range(self.size), key=lambda cell: (
+            abs(cell // cols - (rows - 1) / 2)
+            + abs(cell % cols - (cols - 1) / 2), cell))
+
+        # Maps x | o << size, for the player to move first, to
+        # (depth, score, bound, best cell)
+        self.table = {}
+        # Positions searched and depth completed by the latest minimax
+        self.nodes = 0
+        self.depth = 0
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.cols for _ in range(self.rows)]
+
+    def from_board(self, board):
+        """
+        Returns the (x, o) bitboards of a nested-list board.
+        """
+        x = o = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell == X:
+                    x |= 1 << (i * self.cols + j)
+                elif cell == O:
+                    o |= 1 << (i * self.cols + j)
+        return x, o
+
+    def won(self, bits):
+        """
+        Returns True if the cells in bits contain k in a row.
+        """
+        return any(bits & line == line for line in self.lines)
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        if self.terminal(board):
+            return None
+        x, o = self.from_board(board)
+        return X if bin(x).count("1") <= bin(o).count("1") else O
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        if self.terminal(board):
+            return None
+        return {
+            (i, j)
+            for i, row in enumerate(board)
+            for j, cell in enumerate(row)
+            if cell == EMPTY
+        }
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if not (0 <= i < self.rows and 0 <= j < self.cols) or board[i][j] != EMPTY:
+            raise ValueError('This move is illegal.')
+        x, o = self.from_board(board)
+        board_copy = [list(row) for row in board]
+        board_copy[i][j] = X if bin(x).count("1") <= bin(o).count("1") else O
+        return board_copy
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        x, o = self.from_board(board)
+        if self.won(x):
+            return X
+        if self.won(o):
+            return O
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        x, o = self.from_board(board)
+        return self.won(x) or self.won(o) or x | o == self.full
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        return {X: 1, O: -1, None: 0}[self.winner(board)]
+
+    def evaluate(self, me, them):
+        """
+        Returns a heuristic score of a position for the player whose marks
+        are me: every line still open to only one player counts for that
+        player, four times more for each mark already on it.
+        """
+        score = 0
+        for line in self.lines:
+            mine = me & line
+            theirs = them & line
+            if mine and not theirs:
+                score += 4 ** bin(mine).count("1")
+            elif theirs and not mine:
+                score -= 4 ** bin(theirs).count("1")
+        return score
+
+    def minimax(self, board, time_limit=1.0, max_depth=None):
+        """
+        Returns the best action for the current player on the board found
+        by searching one move deeper at a time for time_limit seconds, or
+        None if the game is over.
+        """
+        if self.terminal(board):
+            return None
+        deadline = time.perf_counter() + time_limit
+        x, o = self.from_board(board)
+        if bin(x).count("1") <= bin(o).count("1"):
+            me, them = x, o
+        else:
+            me, them = o, x
+        key = me | them << self.size
+        if len(self.table) > MAX_TABLE:
+            self.table.clear()
+
+        empty = self.size - bin(x | o).count("1")
+        if max_depth is not None:
+            empty = min(empty, max_depth)
+        best = next(cell for cell in self.order if not (x | o) >> cell & 1)
+        self.nodes = 0
+        self.depth = 0
+        for depth in range(1, empty + 1):
+            try:
+                score = self.negamax(me, them, depth, 0, -math.inf, math.inf,
+                                     deadline)
+            except Timeout:
+                break
+            best = self.table[key][3]
+            self.depth = depth
+            # A forced win or loss will not change with more depth
+            if abs(score) > WIN_THRESHOLD:
+                break
+        return divmod(best, self.cols)
+
+    def negamax(self, me, them, depth, ply, alpha, beta, deadline):
+        """
+        Returns the score of a position searched depth moves ahead, from the
+        point of view of the player to move, whose marks are me. ply is the
+        number of moves made since the root.
+        """
+        self.nodes += 1
+        if self.nodes & 1023 == 0 and time.perf_counter() > deadline:
+            raise Timeout()
+        if me | them == self.full:
+            return 0
+
+        key = me | them << self.size
+        entry = self.table.get(key)
+        first = None
+        original_alpha = alpha
+        if entry is not None:
+            entry_depth, score, bound, first = entry
+            # The root must be searched to find its best move
+            if ply > 0 and entry_depth >= depth:
+                # Stored wins count moves from the stored position
+                if score > WIN_THRESHOLD:
+                    score -= ply
+                elif score < -WIN_THRESHOLD:
+                    score += ply
+                if bound == EXACT:
+                    return score
+                if bound == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+        if depth == 0:
+            return self.evaluate(me, them)
+
+        best_score = -math.inf
+        best_cell = None
+        # Try the best move of an earlier search first
+        cells = self.order
+        if first is not None:
+            cells = [first] + [cell for cell in cells if cell != first]
+        occupied = me | them
+        for cell in cells:
+            bit = 1 << cell
+            if occupied & bit:
+                continue
+            mine = me | bit
+            if any(mine & line == line for line in self.lines_through[cell]):
+                score = WIN_SCORE - ply - 1
+            else:
+                score = -self.negamax(them, mine, depth - 1, ply + 1,
+                                      -beta, -alpha, deadline)
+            if score > best_score:
+                best_score = score
+                best_cell = cell
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        stored = best_score
+        if stored > WIN_THRESHOLD:
+            stored += ply
+        elif stored < -WIN_THRESHOLD:
+            stored -= ply
+        self.table[key] = (depth, stored, bound, best_cell)
+        return best_score
@@ -3,6 +3,7 @@ import sys
 import time
 
 import tictactoe as ttt
+from board import Board
 
 pygame.init()
 size = width, height = 600, 400
@@ -19,8 +20,11 @@ mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
+# Look AI moves up instead of searching for them
+ttt.load_book()
+
 user = None
-board = ttt.initial_state()
+board = Board()
 ai_turn = False
 
 while True:
@@ -140,7 +144,7 @@ while True:
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
                     user = None
-                    board = ttt.initial_state()
+                    board = Board()
                     ai_turn = False
 
     pygame.display.flip()
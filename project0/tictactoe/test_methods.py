@@ -1,5 +1,14 @@
+import os
+import tempfile
+import time
 import unittest
 import tictactoe as ttt
+import bitboard
+import book
+import mnk
+from board import Board
+import tournament
+from concurrent.futures import ProcessPoolExecutor
 
 X = "X"
 O = "O"
@@ -138,6 +147,215 @@ class TestTTTMethods(unittest.TestCase):
         winner_7 = ttt.winner(self.board_7)
         self.assertEqual(winner_7, O)
 
+    def test_get_best_score(self):
+        for board in (self.board_2, self.board_3, self.board_5, self.board_7):
+            ttt.nodes_visited = 0
+            expected = ttt.get_best_score_exhaustive(board)
+            exhaustive_nodes = ttt.nodes_visited
+            ttt.nodes_visited = 0
+            self.assertEqual(ttt.get_best_score(board), expected)
+            self.assertLessEqual(ttt.nodes_visited, exhaustive_nodes)
+
+    def test_minimax(self):
+        action = ttt.minimax(self.board_2)
+        self.assertEqual(ttt.get_best_score(ttt.result(self.board_2, action)),
+                         ttt.get_best_score(self.board_2))
+        self.assertIsNone(ttt.minimax(self.board_4))
+
+
+class TestBoardMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.boards = [
+            ttt.initial_state(),
+            [[EMPTY, EMPTY, O],
+             [EMPTY, X, EMPTY],
+             [X, EMPTY, EMPTY]],
+            [[O, X, O],
+             [X, X, X],
+             [O, O, X]],
+            [[X, O, X],
+             [EMPTY, O, X],
+             [EMPTY, O, EMPTY]],
+        ]
+
+    def test_immutable(self):
+        board = Board()
+        self.assertRaises(AttributeError, setattr, board, "x", 1)
+        self.assertIsInstance(board[0], tuple)
+        moved = ttt.result(board, (1, 1))
+        self.assertEqual(board, Board())
+        self.assertEqual(moved[1][1], X)
+        self.assertEqual({board: 0, moved: 1}[Board.from_lists(moved.to_lists())], 1)
+        self.assertRaises(ValueError, ttt.result, moved, (1, 1))
+
+    def test_adapter(self):
+        for lists in self.boards:
+            board = Board.from_lists(lists)
+            self.assertEqual(board.to_lists(), lists)
+            self.assertEqual(board, lists)
+            for function in (ttt.player, ttt.actions, ttt.winner,
+                             ttt.terminal, ttt.utility):
+                self.assertEqual(function(board), function(lists))
+            for action in ttt.actions(lists) or ():
+                self.assertEqual(ttt.result(board, action),
+                                 ttt.result(lists, action))
+
+    def test_minimax(self):
+        board = Board.from_lists(self.boards[1])
+        self.assertEqual(ttt.get_best_score(board),
+                         ttt.get_best_score(self.boards[1]))
+        action = ttt.minimax(board)
+        self.assertEqual(ttt.get_best_score(ttt.result(board, action)),
+                         ttt.get_best_score(board))
+
+
+class TestBitboardMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.boards = [
+            [[EMPTY, EMPTY, O],
+             [EMPTY, X, EMPTY],
+             [X, EMPTY, EMPTY]],
+            [[O, X, O],
+             [X, O, EMPTY],
+             [EMPTY, EMPTY, EMPTY]],
+            [[O, X, O],
+             [X, X, X],
+             [O, O, X]],
+            [[X, O, X],
+             [EMPTY, O, X],
+             [EMPTY, O, EMPTY]],
+        ]
+
+    def test_conversion(self):
+        for board in self.boards:
+            self.assertEqual(bitboard.to_board(*bitboard.from_board(board)), board)
+
+    def test_rules(self):
+        for board in self.boards:
+            x, o = bitboard.from_board(board)
+            self.assertEqual(bitboard.winner(x, o), ttt.winner(board))
+            self.assertEqual(bitboard.terminal(x, o), ttt.terminal(board))
+
+    def test_minimax(self):
+        self.assertIsNone(bitboard.minimax(self.boards[2]))
+        self.assertEqual(bitboard.value(*bitboard.from_board(ttt.initial_state())), 0)
+        for board in self.boards[:2]:
+            action = bitboard.minimax(board)
+            self.assertEqual(ttt.get_best_score(ttt.result(board, action)),
+                             ttt.get_best_score(board))
+
+
+class TestBookMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "book.bin")
+        self.book = book.Book.load(self.path)
+
+    def tearDown(self):
+        os.remove(self.path)
+        os.rmdir(os.path.dirname(self.path))
+
+    def test_symmetries(self):
+        self.assertEqual(len({tuple(s) for s in book.SYMMETRIES}), 8)
+        # Every corner opening is the same position
+        corners = {book.canonical(1 << cell, 0)[0] for cell in (0, 2, 6, 8)}
+        self.assertEqual(len(corners), 1)
+
+    def test_lookup(self):
+        self.assertEqual(book.Book.open(self.path).entries, self.book.entries)
+        board = [[EMPTY, EMPTY, O],
+                 [EMPTY, X, EMPTY],
+                 [X, EMPTY, EMPTY]]
+        value, action = self.book.lookup(board)
+        self.assertEqual(value, ttt.get_best_score(board))
+        self.assertEqual(ttt.get_best_score(ttt.result(board, action)), value)
+        self.assertEqual(self.book.lookup(ttt.initial_state())[0], 0)
+
+        # Finished and unreachable positions are not in the book
+        self.assertIsNone(self.book.lookup([[X, X, X],
+                                            [O, O, EMPTY],
+                                            [EMPTY, EMPTY, EMPTY]]))
+        self.assertIsNone(self.book.lookup([[O, O, EMPTY],
+                                            [EMPTY, EMPTY, EMPTY],
+                                            [EMPTY, EMPTY, EMPTY]]))
+
+
+class TestMNKMethods(unittest.TestCase):
+
+    def test_lines(self):
+        self.assertEqual(len(mnk.Game(4, 4, 4).lines), 10)
+        self.assertEqual(len(mnk.Game(5, 5, 4).lines), 28)
+        self.assertEqual(mnk.Game().lines, list(bitboard.WIN_MASKS))
+        self.assertRaises(ValueError, mnk.Game, 3, 3, 4)
+
+    def test_rules(self):
+        game = mnk.Game(4, 4, 4)
+        board = game.initial_state()
+        for action in [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2), (1, 2)]:
+            self.assertFalse(game.terminal(board))
+            board = game.result(board, action)
+        self.assertEqual(game.player(board), X)
+        board = game.result(board, (0, 3))
+        self.assertEqual(game.winner(board), X)
+        self.assertEqual(game.utility(board), 1)
+        self.assertIsNone(game.actions(board))
+
+    def test_minimax(self):
+        game = mnk.Game()
+        board = [[EMPTY, EMPTY, O],
+                 [EMPTY, X, EMPTY],
+                 [X, EMPTY, EMPTY]]
+        action = game.minimax(board)
+        self.assertEqual(ttt.get_best_score(ttt.result(board, action)),
+                         ttt.get_best_score(board))
+
+        # X must block O's row on a 4x4 board
+        game = mnk.Game(4, 4, 4)
+        board = [[O, O, O, EMPTY],
+                 [X, X, EMPTY, EMPTY],
+                 [X, EMPTY, EMPTY, EMPTY],
+                 [EMPTY, EMPTY, EMPTY, EMPTY]]
+        self.assertEqual(game.minimax(board), (0, 3))
+
+    def test_deadline(self):
+        game = mnk.Game(5, 5, 4)
+        start = time.perf_counter()
+        action = game.minimax(game.initial_state(), time_limit=0.2)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertIn(action, game.actions(game.initial_state()))
+        self.assertGreater(game.depth, 0)
+
+    def test_initial_state(self):
+        game = mnk.Game(4, 4, 3)
+        board = game.initial_state()
+        self.assertEqual(board, [[EMPTY] * 4 for _ in range(4)])
+        self.assertIn(game.minimax(board, time_limit=0.2),
+                      game.actions(board))
+        self.assertEqual(len(ttt.initial_state()), 3)
+        self.assertRaises(ValueError, ttt.minimax, board)
+
+
+class TestTournamentMethods(unittest.TestCase):
+
+    def test_play_game(self):
+        winner, latencies = tournament.play_game(
+            "bitboard", "bitboard", (3, 3, 3), 0.1, 0)
+        self.assertIsNone(winner)
+        self.assertEqual(len(latencies), 9)
+        winner, latencies = tournament.play_game(
+            "random", "random", (3, 3, 3), 0.1, 0)
+        self.assertEqual(latencies, [])
+
+    def test_run_matchup(self):
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            summary = tournament.run_matchup(
+                executor, "bitboard", "random", 10, (3, 3, 3), 0.1)
+        self.assertEqual(sum(summary["outcomes"].values()), 10)
+        self.assertEqual(tournament.ai_losses(summary, "bitboard"), 0)
+        self.assertIn("p99", summary["latency_ms"])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -4,16 +4,34 @@ Tic Tac Toe Player
 
 import math
 from random import randint
-from copy import deepcopy
+from board import Board
+from book import BOOK, Book
 from helper import count_value, get_positions_of_value, get_winning_position_sets
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Number of positions evaluated by get_best_score and get_best_score_exhaustive
+nodes_visited = 0
+
+# Order moves are tried in when nothing better is known: center, corners, edges
+MOVE_ORDER = {
+    (1, 1): 0,
+    (0, 0): 1, (0, 2): 1, (2, 0): 1, (2, 2): 1,
+    (0, 1): 2, (1, 0): 2, (1, 2): 2, (2, 1): 2,
+}
+
+# Maps the number of empty cells to the last move that caused a cutoff there
+killer_moves = {}
+
+# Perfect-play table minimax answers from after load_book, see book.py
+opening_book = None
+
 def initial_state():
     """
     Returns starting state of the board.
+    Board() is the immutable equivalent, mnk.Game plays on other sizes.
     """
     return [[EMPTY, EMPTY, EMPTY],
             [EMPTY, EMPTY, EMPTY],
@@ -23,6 +41,8 @@ def player(board):
     """
     Returns player who has the next turn on a board.
     """
+    if isinstance(board, Board):
+        return board.player()
     if terminal(board):
         return None
     # Get number of X's and O's
@@ -40,6 +60,8 @@ def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
+    if isinstance(board, Board):
+        return board.actions()
     if terminal(board):
         return None
     else:
@@ -50,11 +72,13 @@ def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
+    if isinstance(board, Board):
+        return board.move(action)
     empty_positions = get_positions_of_value(board, EMPTY)
     if action not in empty_positions:
         raise ValueError('This move is illegal.')
-    # Make deep copy of board to prevent direct mutation
-    board_copy = deepcopy(board)
+    # Copy the rows of the board to prevent direct mutation
+    board_copy = [list(row) for row in board]
     current_player = player(board_copy)
     row, col = action
     # Take the action on the copy of the board
@@ -65,6 +89,8 @@ def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
+    if isinstance(board, Board):
+        return board.winner()
     player = None
     # Get positions of two players
     x_positions = get_positions_of_value(board, X)
@@ -85,6 +111,8 @@ def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
+    if isinstance(board, Board):
+        return board.terminal()
     empty_positions = get_positions_of_value(board, EMPTY)
     # If the board is full, the game is over
     if not empty_positions:
@@ -100,6 +128,8 @@ def utility(board):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
+    if isinstance(board, Board):
+        return board.utility()
     player = winner(board)
     if player == X:
         game_value = 1
@@ -109,58 +139,129 @@ def utility(board):
         game_value = 0
     return game_value
 
+def load_book(path=BOOK):
+    """
+    Loads the opening book minimax looks moves up in, building it first if
+    it is missing.
+    """
+    global opening_book
+    opening_book = Book.load(path)
+
 def minimax(board):
     """
     Returns the optimal action for the current player on the board.
     """
+    # The book and move ordering index cells of a 3x3 board
+    if len(board) != 3 or any(len(row) != 3 for row in board):
+        raise ValueError("minimax plays 3x3 boards, mnk.Game plays others")
     if terminal(board):
         return None
-    else:
+    entry = None if opening_book is None else opening_book.lookup(board)
+    if entry is not None:
+        return entry[1]
+    best_action = None
+    current_player = player(board)
+    empty_positions = ordered_actions(board)
+    if current_player == X:
+        # Initialize best score with lowest possible number
+        best_score = float("-inf")
+        # Check each available move on the board
+        for pos in empty_positions:
+            board_result = result(board, pos)
+            # Get result of that move, only needing to know if it beats
+            # the best so far
+            score = get_best_score(board_result, best_score, math.inf)
+            # Check against existing best score
+            # X player wants a higher score
+            if (score > best_score):
+                best_score = score
+                best_action = pos
+            # Naive pruning
+            if best_score == 1:
+                break
+        return best_action
+    elif current_player == O:
         best_action = None
-        current_player = player(board)
-        empty_positions = get_positions_of_value(board, EMPTY)
-        if current_player == X:
-            # Initialize best score with lowest possible number
-            best_score = float("-inf")
-            # Check each available move on the board
-            for pos in empty_positions:
-                board_result = result(board, pos)
-                # Get result of that move
-                score = get_best_score(board_result)
-                # Check against existing best score
-                # X player wants a higher score
-                if (score > best_score):
-                    best_score = score
-                    best_action = pos
-                # Naive pruning
-                if best_score == 1:
-                    break
-            return best_action
-        elif current_player == O:
-            best_action = None
-            # Initialize best score with highest possible number
-            best_score = float("inf")
-            # Check each available move on the board
-            for pos in empty_positions:
-                board_result = result(board, pos)
-                # Get result of that move
-                score = get_best_score(board_result)
-                # Check against existing best score
-                # O player wants a lower score
-                if (score < best_score):
-                    best_score = score
-                    best_action = pos
-                # Naive pruning
-                if best_score == -1:
-                    break
-            return best_action
-        else:
-            raise ValueError('Player must be X or O.')
+        # Initialize best score with highest possible number
+        best_score = float("inf")
+        # Check each available move on the board
+        for pos in empty_positions:
+            board_result = result(board, pos)
+            # Get result of that move, only needing to know if it beats
+            # the best so far
+            score = get_best_score(board_result, -math.inf, best_score)
+            # Check against existing best score
+            # O player wants a lower score
+            if (score < best_score):
+                best_score = score
+                best_action = pos
+            # Naive pruning
+            if best_score == -1:
+                break
+        return best_action
+    else:
+        raise ValueError('Player must be X or O.')
+
+def ordered_actions(board):
+    """
+    Returns the empty positions on the board, the killer move for this
+    depth first and then center, corners and edges.
+    """
+    empty_positions = get_positions_of_value(board, EMPTY)
+    killer = killer_moves.get(len(empty_positions))
+    return sorted(empty_positions,
+                  key=lambda pos: (pos != killer, MOVE_ORDER[pos], pos))
+
+def get_best_score(board, alpha=-math.inf, beta=math.inf):
+    """
+    Recursive helper function for minimax that returns the best score by player,
+    using alpha-beta pruning.
+
+    alpha is the score X is already assured of and beta the score O is
+    already assured of. A score at or below alpha or at or above beta only
+    bounds the true score, which is exact when it falls between them.
+    """
+    global nodes_visited
+    nodes_visited += 1
+    # Base case, return the result of the board
+    if terminal(board):
+        return utility(board)
+    current_player = player(board)
+    empty_positions = ordered_actions(board)
+    depth = len(empty_positions)
+    if current_player == X:
+        best_score = -math.inf
+        for pos in empty_positions:
+            score = get_best_score(result(board, pos), alpha, beta)
+            best_score = max(best_score, score)
+            alpha = max(alpha, best_score)
+            # O would never allow this position, so stop searching it
+            if alpha >= beta:
+                killer_moves[depth] = pos
+                break
+        return best_score
+    elif current_player == O:
+        best_score = math.inf
+        for pos in empty_positions:
+            score = get_best_score(result(board, pos), alpha, beta)
+            best_score = min(best_score, score)
+            beta = min(beta, best_score)
+            # X would never allow this position, so stop searching it
+            if alpha >= beta:
+                killer_moves[depth] = pos
+                break
+        return best_score
+    else:
+        raise ValueError('Player must be X or O.')
 
-def get_best_score(board):
+def get_best_score_exhaustive(board):
     """
-    Recursive helper function for minimax that returns the best score by player
+    Recursive helper function for minimax that returns the best score by player,
+    searching the whole game tree. Kept as the baseline get_best_score is
+    benchmarked against.
     """
+    global nodes_visited
+    nodes_visited += 1
     # Base case, return the result of the board
     if terminal(board):
         return utility(board)
@@ -174,7 +275,7 @@ def get_best_score(board):
             for pos in empty_positions:
                 board_result = result(board, pos)
                 # Get result of that move
-                score = get_best_score(board_result)
+                score = get_best_score_exhaustive(board_result)
                 # Check against existing best score and get max for X player
                 best_score = max(best_score, score)
             return best_score
@@ -185,7 +286,7 @@ def get_best_score(board):
             for pos in empty_positions:
                 board_result = result(board, pos)
                 # Get result of that move
-                score = get_best_score(board_result)
+                score = get_best_score_exhaustive(board_result)
                 # Check against existing best score and get min for O player
                 best_score = min(best_score, score)
             return best_score
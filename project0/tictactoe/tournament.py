@@ -0,0 +1,171 @@
+"""
+Tic Tac Toe tournament
+
+Usage: python tournament.py [--games N] [--workers W] [--ai ENGINE]
+                            [--size ROWS COLS K] [--time-limit SECONDS]
+                            [--json] [--strict]
+
+Plays N games for each of AI vs AI, AI vs random and random vs AI across a
+pool of worker processes, and reports games per second, the outcome
+distribution and percentiles of the time the AI took per move. With --json
+the summary is printed as JSON for tracking between engine changes, and
+with --strict the exit status is 1 if the AI lost any game, which a perfect
+3x3 engine never does.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bitboard
+import mnk
+import tictactoe as ttt
+
+# Engines that only play 3x3 boards
+ENGINES_3X3 = {
+    "minimax": ttt.minimax,
+    "bitboard": bitboard.minimax,
+}
+
+ENGINES = sorted(ENGINES_3X3) + ["mnk"]
+
+# mnk.Game of the current worker process for each board size, kept so its
+# transposition table is reused between games
+worker_games = {}
+
+def choose_move(engine, game, board, rng, time_limit):
+    """
+    Returns the move an engine, or "random", makes on the board.
+    """
+    if engine == "random":
+        return rng.choice(sorted(game.actions(board)))
+    if engine == "mnk":
+        return game.minimax(board, time_limit)
+    return ENGINES_3X3[engine](board)
+
+def play_game(x_engine, o_engine, size, time_limit, seed):
+    """
+    Plays one game and returns (winner, seconds per AI move).
+    """
+    if size not in worker_games:
+        worker_games[size] = mnk.Game(*size)
+    game = worker_games[size]
+    rng = random.Random(seed)
+    engines = {mnk.X: x_engine, mnk.O: o_engine}
+    board = game.initial_state()
+    latencies = []
+    while not game.terminal(board):
+        engine = engines[game.player(board)]
+        start = time.perf_counter()
+        action = choose_move(engine, game, board, rng, time_limit)
+        if engine != "random":
+            latencies.append(time.perf_counter() - start)
+        board = game.result(board, action)
+    return game.winner(board), latencies
+
+def run_matchup(executor, x_engine, o_engine, games, size, time_limit,
+                chunksize=1):
+    """
+    Plays games between two engines in the pool and returns a summary dict.
+    """
+    start = time.perf_counter()
+    results = list(executor.map(
+        play_game,
+        [x_engine] * games, [o_engine] * games, [size] * games,
+        [time_limit] * games, range(games),
+        chunksize=chunksize,
+    ))
+    seconds = time.perf_counter() - start
+
+    latencies = sorted(t for _, moves in results for t in moves)
+    outcomes = {"X": 0, "O": 0, "tie": 0}
+    for winner, _ in results:
+        outcomes[winner or "tie"] += 1
+    summary = {
+        "x": x_engine,
+        "o": o_engine,
+        "games": games,
+        "seconds": seconds,
+        "games_per_second": games / seconds,
+        "outcomes": outcomes,
+        "moves": len(latencies),
+    }
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=100,
+                                           method="inclusive")
+        summary["latency_ms"] = {
+            "p50": percentiles[49] * 1000,
+            "p90": percentiles[89] * 1000,
+            "p99": percentiles[98] * 1000,
+            "max": latencies[-1] * 1000,
+        }
+    return summary
+
+def ai_losses(summary, ai):
+    """
+    Returns the number of games in a summary the AI lost.
+    """
+    losses = 0
+    if summary["x"] == ai:
+        losses += summary["outcomes"]["O"]
+    if summary["o"] == ai:
+        losses += summary["outcomes"]["X"]
+    return losses
+
+def print_summary(summary):
+    outcomes = summary["outcomes"]
+    print(f"{summary['x']} (X) vs {summary['o']} (O): {summary['games']} games "
+          f"in {summary['seconds']:.2f}s, "
+          f"{summary['games_per_second']:.1f} games/s")
+    print(f"  X wins {outcomes['X']}, O wins {outcomes['O']}, "
+          f"ties {outcomes['tie']}")
+    if "latency_ms" in summary:
+        latency = summary["latency_ms"]
+        print(f"  AI move latency p50 {latency['p50']:.3f}ms, "
+              f"p90 {latency['p90']:.3f}ms, p99 {latency['p99']:.3f}ms, "
+              f"max {latency['max']:.3f}ms over {summary['moves']} moves")
+
+def main():
+    parser = argparse.ArgumentParser(description="Tic Tac Toe tournament")
+    parser.add_argument("--games", type=int, default=100,
+                        help="games per matchup")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--ai", choices=ENGINES, default="minimax")
+    parser.add_argument("--size", type=int, nargs=3, default=[3, 3, 3],
+                        metavar=("ROWS", "COLS", "K"))
+    parser.add_argument("--time-limit", type=float, default=0.1,
+                        help="seconds per move for the mnk engine")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--strict", action="store_true",
+                        help="exit with status 1 if the AI loses a game")
+    args = parser.parse_args()
+    size = tuple(args.size)
+    if args.ai in ENGINES_3X3 and size != (3, 3, 3):
+        sys.exit(f"{args.ai} only plays 3x3 boards, use --ai mnk")
+
+    matchups = [(args.ai, args.ai), (args.ai, "random"), ("random", args.ai)]
+    # Hand out games in a few batches per worker to amortize the IPC
+    chunksize = max(1, args.games // (4 * args.workers))
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        summaries = [
+            run_matchup(executor, x, o, args.games, size, args.time_limit,
+                        chunksize)
+            for x, o in matchups
+        ]
+
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+    else:
+        for summary in summaries:
+            print_summary(summary)
+    losses = sum(ai_losses(summary, args.ai) for summary in summaries)
+    if args.strict and losses:
+        sys.exit(f"{args.ai} lost {losses} games")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Entailment benchmark
+
+Usage: python benchmark.py [--max-symbols N] [--budget SECONDS] [--seed S]
+                            [--parallel] [--workers W]
+
+Times model_check with the "enumerate" and "sat" engines on random 3-SAT
+knowledge bases and on chains of knights and knaves of growing size, checks
+the engines agree, and reports where the SAT solver overtakes enumeration.
+Enumeration is skipped for a family once one check takes longer than the
+budget, since each extra symbol doubles its work.
+
+With --parallel it instead reports the speedup of the "parallel" engine
+with W workers over the serial "compiled" engine on knights chains of 20 to
+28 symbols, whose entailment needs the whole truth table.
+"""
+
+import argparse
+import os
+import random
+import time
+
+from cnf import to_cnf
+from logic import Symbol, Not, And, Or, Biconditional, model_check
+
+# Clauses per variable where random 3-SAT is hardest
+RATIO = 4.26
+
+
+def random_3sat(n, rng):
+    """Returns (knowledge, query) for a random 3-SAT knowledge base over n
+    symbols, querying one of them."""
+    symbols = [Symbol(f"x{i}") for i in range(n)]
+    clauses = []
+    for _ in range(round(RATIO * n)):
+        clauses.append(Or(*(
+            symbol if rng.random() < 0.5 else Not(symbol)
+            for symbol in rng.sample(symbols, 3)
+        )))
+    return And(*clauses), rng.choice(symbols)
+
+
+def knights_chain(n):
+    """Returns (knowledge, query) for n inhabitants where each says the next
+    is a knave and the last says "I am both a knight and a knave.", querying
+    the first inhabitant, whose kind follows from everyone else's."""
+    knights = [Symbol(f"{i} is a Knight") for i in range(n)]
+    knaves = [Symbol(f"{i} is a Knave") for i in range(n)]
+    knowledge = And()
+    for i in range(n):
+        knowledge.add(Or(knights[i], knaves[i]))
+        knowledge.add(Not(And(knights[i], knaves[i])))
+        if i < n - 1:
+            statement = knaves[i + 1]
+        else:
+            statement = And(knights[i], knaves[i])
+        knowledge.add(Biconditional(knights[i], statement))
+        knowledge.add(Biconditional(knaves[i], Not(statement)))
+    query = knights[0] if n % 2 == 0 else knaves[0]
+    return knowledge, query
+
+
+def measure(knowledge, query, engine, **options):
+    """Returns (answer, seconds) of one entailment check."""
+    start = time.perf_counter()
+    answer = model_check(knowledge, query, engine=engine, **options)
+    return answer, time.perf_counter() - start
+
+
+def run_family(name, sizes, make, budget):
+    """Times both engines on each size and returns the number of symbols
+    at which the SAT engine first beat enumeration, or None."""
+    print(f"\n{name}")
+    print(f"{'symbols':>7} {'clauses':>7} {'entailed':>8} "
+          f"{'enumerate':>10} {'sat':>9} {'speedup':>8}")
+    crossover = None
+    enumerate_budget = True
+    for size in sizes:
+        knowledge, query = make(size)
+        symbols = len(knowledge.symbols() | query.symbols())
+        clauses = len(to_cnf(knowledge).clauses)
+        answer, sat_seconds = measure(knowledge, query, "sat")
+
+        if enumerate_budget:
+            expected, seconds = measure(knowledge, query, "enumerate")
+            if answer != expected:
+                raise AssertionError(f"engines disagree on {name} "
+                                     f"with {symbols} symbols")
+            enumerate_budget = seconds <= budget
+            if crossover is None and sat_seconds < seconds:
+                crossover = symbols
+            print(f"{symbols:>7} {clauses:>7} {str(answer):>8} "
+                  f"{seconds:>9.4f}s {sat_seconds:>8.4f}s "
+                  f"{seconds / sat_seconds:>7.1f}x")
+        else:
+            print(f"{symbols:>7} {clauses:>7} {str(answer):>8} "
+                  f"{'-':>10} {sat_seconds:>8.4f}s {'-':>8}")
+    return crossover
+
+
+def run_parallel(workers):
+    """Times the compiled engine serially and in parallel on knights
+    chains."""
+    print(f"knights chain, {workers} workers")
+    print(f"{'symbols':>7} {'serial':>9} {'parallel':>9} {'speedup':>8}")
+    for inhabitants in range(10, 15):
+        knowledge, query = knights_chain(inhabitants)
+        answer, serial = measure(knowledge, query, "compiled")
+        expected, seconds = measure(knowledge, query, "parallel",
+                                    workers=workers)
+        if answer != expected:
+            raise AssertionError(f"engines disagree on {inhabitants} "
+                                 f"inhabitants")
+        print(f"{2 * inhabitants:>7} {serial:>8.3f}s {seconds:>8.3f}s "
+              f"{serial / seconds:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entailment benchmark")
+    parser.add_argument("--max-symbols", type=int, default=200)
+    parser.add_argument("--budget", type=float, default=5.0,
+                        help="seconds after which to stop enumerating")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--parallel", action="store_true",
+                        help="compare the parallel and compiled engines")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    if args.parallel:
+        run_parallel(args.workers)
+        return
+
+    rng = random.Random(args.seed)
+    sizes = [n for n in [4, 8, 12, 16, 18, 20, 25, 50, 100, 150, 200]
+             if n <= args.max_symbols]
+    crossovers = {
+        "random 3-SAT": run_family(
+            "random 3-SAT", sizes, lambda n: random_3sat(n, rng),
+            args.budget),
+        "knights chain": run_family(
+            "knights chain", [n // 2 for n in sizes],
+            knights_chain, args.budget),
+    }
+
+    print()
+    for name, crossover in crossovers.items():
+        if crossover is None:
+            print(f"{name}: enumeration was never slower")
+        else:
+            print(f"{name}: sat is faster from {crossover} symbols")
+
+
+if __name__ == "__main__":
+    main()
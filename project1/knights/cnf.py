@@ -0,0 +1,153 @@
+"""Conversion of logical sentences to conjunctive normal form.
+
+Sentences are encoded with the Tseitin transformation: every compound
+subsentence gets a fresh variable defined to be equivalent to it, so the
+clause count grows linearly with the size of the sentence instead of
+exponentially. Clauses are stored as tuples of integer literals, where
+variable v is the literal v and its negation is -v, as in the DIMACS format
+SAT solvers use.
+"""
+
+from logic import (Sentence, Symbol, Not, And, Or, Implication,
+                   Biconditional)
+
+
+class CNF():
+    """A database of clauses over integer variables, some of which stand
+    for the symbols of the sentences added to it."""
+
+    def __init__(self):
+        # Maps symbol names to variables, and variables to names or None
+        self.variables = {}
+        self.names = [None]
+        self.clauses = []
+
+        # Literal standing for each subsentence encoded so far
+        self.literals = {}
+        self.true_literal = None
+
+    @property
+    def num_variables(self):
+        return len(self.names) - 1
+
+    def variable(self, name):
+        """Returns the variable of a symbol name, creating it if new."""
+        variable = self.variables.get(name)
+        if variable is None:
+            variable = self.new_variable(name)
+            self.variables[name] = variable
+        return variable
+
+    def new_variable(self, name=None):
+        """Returns a fresh variable."""
+        self.names.append(name)
+        return len(self.names) - 1
+
+    def add_clause(self, literals):
+        """Adds a clause, dropping it if it is a tautology."""
+        clause = tuple(dict.fromkeys(literals))
+        if any(-literal in clause for literal in clause):
+            return
+        self.clauses.append(clause)
+
+    def add(self, sentence):
+        """Asserts that a sentence is true."""
+        Sentence.validate(sentence)
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.add_clause([self.literal(disjunct)
+                             for disjunct in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            self.add_clause([-self.literal(sentence.antecedent),
+                             self.literal(sentence.consequent)])
+        else:
+            self.add_clause([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to a sentence, adding the clauses
+        that define it."""
+        literal = self.literals.get(sentence)
+        if literal is not None:
+            return literal
+
+        if isinstance(sentence, Symbol):
+            literal = self.variable(sentence.name)
+        elif isinstance(sentence, Not):
+            literal = -self.literal(sentence.operand)
+        elif isinstance(sentence, And):
+            literal = self.define_and(
+                [self.literal(conjunct) for conjunct in sentence.conjuncts])
+        elif isinstance(sentence, Or):
+            literal = -self.define_and(
+                [-self.literal(disjunct) for disjunct in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            literal = -self.define_and([self.literal(sentence.antecedent),
+                                        -self.literal(sentence.consequent)])
+        elif isinstance(sentence, Biconditional):
+            literal = self.define_iff(self.literal(sentence.left),
+                                      self.literal(sentence.right))
+        else:
+            raise TypeError(f"cannot encode {type(sentence).__name__}")
+
+        self.literals[sentence] = literal
+        return literal
+
+    def true(self):
+        """Returns a literal that is always true."""
+        if self.true_literal is None:
+            self.true_literal = self.new_variable()
+            self.clauses.append((self.true_literal,))
+        return self.true_literal
+
+    def define_and(self, literals):
+        """Returns a fresh variable equivalent to the conjunction of
+        literals."""
+        literals = list(dict.fromkeys(literals))
+        if not literals:
+            return self.true()
+        if len(literals) == 1:
+            return literals[0]
+        variable = self.new_variable()
+        for literal in literals:
+            self.add_clause([-variable, literal])
+        self.add_clause([variable] + [-literal for literal in literals])
+        return variable
+
+    def define_iff(self, left, right):
+        """Returns a fresh variable equivalent to left <=> right."""
+        if left == right:
+            return self.true()
+        if left == -right:
+            return -self.true()
+        variable = self.new_variable()
+        self.add_clause([-variable, -left, right])
+        self.add_clause([-variable, left, -right])
+        self.add_clause([variable, left, right])
+        self.add_clause([variable, -left, -right])
+        return variable
+
+    def decode(self, values):
+        """Returns the truth value of each symbol in an assignment, given
+        as a sequence indexed by variable."""
+        return {name: bool(values[variable])
+                for name, variable in self.variables.items()}
+
+    def dimacs(self):
+        """Returns the clauses in DIMACS CNF format."""
+        lines = [f"c {variable} {name}"
+                 for variable, name in enumerate(self.names)
+                 if name is not None]
+        lines.append(f"p cnf {self.num_variables} {len(self.clauses)}")
+        lines.extend(" ".join(map(str, clause)) + " 0"
+                     for clause in self.clauses)
+        return "\n".join(lines) + "\n"
+
+
+def to_cnf(*sentences):
+    """Returns the CNF asserting every given sentence."""
+    cnf = CNF()
+    for sentence in sentences:
+        cnf.add(sentence)
+    return cnf
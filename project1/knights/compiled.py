@@ -0,0 +1,198 @@
+"""Compilation of logical sentences to bit-parallel Python functions.
+
+A compiled sentence is straight-line Python code with one assignment per
+distinct subsentence, generated once instead of walking the sentence tree
+for every model. Its inputs are columns: one integer per symbol whose bit j
+is the value of the symbol in the j-th model of a batch. And, Or and Not
+become &, | and ^ on those integers, so a single call evaluates the sentence
+in every model of the batch and returns an integer with bit j set if it is
+true in model j. Python's unbounded integers play the part of boolean
+arrays, so a batch can be as large as memory allows.
+"""
+
+from logic import (Sentence, Symbol, Not, And, Or, Implication,
+                   Biconditional)
+
+# Most operands joined in one expression, since Python cannot compile very
+# long chains of operators
+CHAIN = 64
+
+# Models evaluated per batch when enumerating the truth table
+CHUNK_SIZE = 1 << 16
+
+
+class Compiled():
+    """A sentence compiled over an ordered list of symbol names."""
+
+    def __init__(self, sentence, symbols=None):
+        Sentence.validate(sentence)
+        if symbols is None:
+            symbols = sorted(sentence.symbols())
+        self.sentence = sentence
+        self.symbols = list(symbols)
+        self.index = {name: i for i, name in enumerate(self.symbols)}
+
+        self.lines = []
+        self.names = {}
+        result = self.emit(sentence)
+        self.source = "\n    ".join(
+            ["def evaluate(columns, mask):"] + self.lines + [f"return {result}"]
+        )
+        namespace = {}
+        exec(self.source, namespace)
+        self.function = namespace["evaluate"]
+
+    def emit(self, sentence):
+        """Adds the line computing a subsentence, returning the local name
+        that holds it."""
+        name = self.names.get(sentence)
+        if name is not None:
+            return name
+
+        if isinstance(sentence, Symbol):
+            if sentence.name not in self.index:
+                raise ValueError(f"variable {sentence.name} not in symbols")
+            expression = f"columns[{self.index[sentence.name]}]"
+        elif isinstance(sentence, Not):
+            expression = f"mask ^ {self.emit(sentence.operand)}"
+        elif isinstance(sentence, And):
+            expression = self.chain(
+                " & ", [self.emit(conjunct) for conjunct in sentence.conjuncts]
+            ) or "mask"
+        elif isinstance(sentence, Or):
+            expression = self.chain(
+                " | ", [self.emit(disjunct) for disjunct in sentence.disjuncts]
+            ) or "0"
+        elif isinstance(sentence, Implication):
+            antecedent = self.emit(sentence.antecedent)
+            consequent = self.emit(sentence.consequent)
+            expression = f"(mask ^ {antecedent}) | {consequent}"
+        elif isinstance(sentence, Biconditional):
+            left = self.emit(sentence.left)
+            right = self.emit(sentence.right)
+            expression = f"mask ^ {left} ^ {right}"
+        else:
+            raise TypeError(f"cannot compile {type(sentence).__name__}")
+
+        name = self.assign(expression)
+        self.names[sentence] = name
+        return name
+
+    def assign(self, expression):
+        """Adds a line assigning an expression to a new local name."""
+        name = f"t{len(self.lines)}"
+        self.lines.append(f"{name} = {expression}")
+        return name
+
+    def chain(self, operator, names):
+        """Returns an expression joining names with operator, assigning
+        partial results so no expression joins more than CHAIN names."""
+        expression = operator.join(names[:CHAIN])
+        for start in range(CHAIN, len(names), CHAIN):
+            partial = self.assign(expression)
+            expression = operator.join([partial] + names[start:start + CHAIN])
+        return expression
+
+    def evaluate(self, model):
+        """Evaluates the sentence in a model mapping symbol names to truth
+        values, like Sentence.evaluate."""
+        return bool(self.function(
+            [1 if model[name] else 0 for name in self.symbols], 1))
+
+    def evaluate_bits(self, bits):
+        """Evaluates the sentence in the model where symbol i is true if bit
+        i of bits is set."""
+        return bool(self.function(
+            [bits >> i & 1 for i in range(len(self.symbols))], 1))
+
+    def evaluate_batch(self, columns, size):
+        """Evaluates the sentence in a batch of size models given as
+        columns, returning an integer with bit j set if it is true in model
+        j."""
+        return self.function(columns, (1 << size) - 1)
+
+
+def transpose(models, n):
+    """Returns the columns of a batch of models over n symbols, each given as
+    an integer with bit i set if symbol i is true."""
+    columns = [0] * n
+    for j, bits in enumerate(models):
+        for i in range(n):
+            if bits >> i & 1:
+                columns[i] |= 1 << j
+    return columns
+
+
+def truth_table(n):
+    """Returns the columns of all 2 ** n models over n symbols, where model
+    j assigns symbol i bit i of j."""
+    size = 1 << n
+    columns = []
+    for i in range(n):
+        # 2 ** i false values then 2 ** i true ones, doubled up to size
+        period = 2 << i
+        column = ((1 << (1 << i)) - 1) << (1 << i)
+        while period < size:
+            column |= column << period
+            period *= 2
+        columns.append(column)
+    return columns
+
+
+def counter_model(knowledge, query, chunk_size=CHUNK_SIZE):
+    """Returns a model, mapping symbol names to truth values, in which
+    knowledge is true and query is false, or None if there is none."""
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    return search(Compiled(knowledge, symbols), Compiled(query, symbols),
+                  chunk_size=chunk_size)
+
+
+def search(knowledge, query, fixed=None, chunk_size=CHUNK_SIZE, stop=None):
+    """Returns the first model agreeing with fixed, a dict of symbol names to
+    truth values, in which compiled knowledge is true and compiled query is
+    false, or None if there is none.
+
+    Model j of the truth table assigns the i-th symbol not in fixed bit i
+    of j. The table is checked in chunks of consecutive models, chunk_size
+    rounded down to a power of two, so the low symbols take the same columns
+    in every chunk and the others are constant within one. Memory stays
+    proportional to the chunk size, and the search stops at the first chunk
+    holding a counter-model, or returns None early once stop, an Event, is
+    set.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    if knowledge.symbols != query.symbols:
+        raise ValueError("sentences must be compiled over the same symbols")
+    fixed = fixed or {}
+    free = [i for i, name in enumerate(knowledge.symbols)
+            if name not in fixed]
+
+    low = min(len(free), chunk_size.bit_length() - 1)
+    size = 1 << low
+    mask = (1 << size) - 1
+    columns = [mask if fixed.get(name) else 0 for name in knowledge.symbols]
+    for i, column in zip(free, truth_table(low)):
+        columns[i] = column
+    high = free[low:]
+    for chunk in range(1 << len(high)):
+        if stop is not None and stop.is_set():
+            return None
+        for bit, i in enumerate(high):
+            columns[i] = mask if chunk >> bit & 1 else 0
+        knowledge_true = knowledge.evaluate_batch(columns, size)
+        if not knowledge_true:
+            continue
+        counter = knowledge_true & ~query.evaluate_batch(columns, size)
+        if counter:
+            # Report the first counter-model in the chunk
+            j = (counter & -counter).bit_length() - 1
+            return {name: bool(columns[i] >> j & 1)
+                    for i, name in enumerate(knowledge.symbols)}
+    return None
+
+
+def entails(knowledge, query, chunk_size=CHUNK_SIZE):
+    """Checks if knowledge base entails query by evaluating both over the
+    truth table, chunk_size models at a time."""
+    return counter_model(knowledge, query, chunk_size) is None
@@ -0,0 +1,140 @@
+"""Random knights and knaves puzzles.
+
+Usage: python generator.py INHABITANTS STATEMENTS [--seed S] [--unique]
+
+Every inhabitant is secretly a knight, who only tells the truth, or a
+knave, who only lies. Each statement is a claim about the kinds of one or
+two inhabitants, negated if needed so the speaker is truthful exactly when
+a knight, which keeps the puzzle consistent with the secret solution. The
+knowledge base is written like the puzzles in puzzle.py.
+"""
+
+import argparse
+import random
+import string
+
+from logic import Symbol, Not, And, Or, Implication, Biconditional
+from sat import KnowledgeBase
+
+# Attempts at a puzzle with one solution before giving up
+ATTEMPTS = 100
+
+
+def inhabitant_name(i):
+    """Returns A to Z for the first 26 inhabitants, then AA, AB and so on."""
+    name = ""
+    i += 1
+    while i:
+        i, letter = divmod(i - 1, 26)
+        name = string.ascii_uppercase[letter] + name
+    return name
+
+
+class Puzzle():
+    """A generated puzzle, with its statements, knowledge base and the
+    solution it was generated from."""
+
+    def __init__(self, names, solution):
+        self.names = names
+        self.knights = [Symbol(f"{name} is a Knight") for name in names]
+        self.knaves = [Symbol(f"{name} is a Knave") for name in names]
+        # Whether each inhabitant is a knight
+        self.solution = solution
+        self.statements = []
+
+        # Base knowledge: everyone is a knight or a knave, but not both
+        self.knowledge = And()
+        for knight, knave in zip(self.knights, self.knaves):
+            self.knowledge.add(Or(knight, knave))
+            self.knowledge.add(Not(And(knight, knave)))
+
+    def symbols(self):
+        return self.knights + self.knaves
+
+    def model(self):
+        """Returns the solution as a model of the symbols."""
+        model = {}
+        for knight, knave, value in zip(self.knights, self.knaves,
+                                        self.solution):
+            model[knight.name] = value
+            model[knave.name] = not value
+        return model
+
+    def claim(self, rng):
+        """Returns (text, sentence) of a random claim about one or two
+        inhabitants, with text as it would follow "It is true that"."""
+        x, y = rng.sample(range(len(self.names)), 2)
+        a, b = self.names[x], self.names[y]
+        claims = [
+            (f"{a} is a knight.", self.knights[x]),
+            (f"{a} is a knave.", self.knaves[x]),
+            (f"{a} and {b} are the same kind.",
+             Biconditional(self.knights[x], self.knights[y])),
+            (f"{a} and {b} are of different kinds.",
+             Not(Biconditional(self.knights[x], self.knights[y]))),
+            (f"{a} or {b} is a knave.",
+             Or(self.knaves[x], self.knaves[y])),
+            (f"if {a} is a knight, then {b} is a knave.",
+             Implication(self.knights[x], self.knaves[y])),
+        ]
+        return rng.choice(claims)
+
+    def add_statement(self, rng):
+        """Has a random inhabitant make a random claim, true if they are a
+        knight and false if they are a knave."""
+        speaker = rng.randrange(len(self.names))
+        text, sentence = self.claim(rng)
+        if sentence.evaluate(self.model()) == self.solution[speaker]:
+            text = text[0].upper() + text[1:]
+        else:
+            text = f"It is not true that {text}"
+            sentence = Not(sentence)
+        self.statements.append(f"{self.names[speaker]} says \"{text}\"")
+
+        # If the speaker is a knight the claim is true, if a knave it is not
+        self.knowledge.add(Biconditional(self.knights[speaker], sentence))
+        self.knowledge.add(Biconditional(self.knaves[speaker], Not(sentence)))
+
+    def unique(self):
+        """Checks if the solution is the only one."""
+        entailed = KnowledgeBase(self.knowledge).entailed(self.symbols())
+        return len(entailed) == len(self.names)
+
+
+def generate(inhabitants, statements, rng=random, unique=False):
+    """Returns a random Puzzle. With unique, only returns puzzles whose
+    statements determine every inhabitant, raising ValueError if none is
+    found within ATTEMPTS tries."""
+    if inhabitants < 2:
+        raise ValueError("puzzles need at least two inhabitants")
+    names = [inhabitant_name(i) for i in range(inhabitants)]
+    for _ in range(ATTEMPTS if unique else 1):
+        puzzle = Puzzle(names, [rng.random() < 0.5 for _ in names])
+        for _ in range(statements):
+            puzzle.add_statement(rng)
+        if not unique or puzzle.unique():
+            return puzzle
+    raise ValueError(f"no puzzle of {inhabitants} inhabitants and "
+                     f"{statements} statements with one solution found")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Knights puzzle generator")
+    parser.add_argument("inhabitants", type=int)
+    parser.add_argument("statements", type=int)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--unique", action="store_true",
+                        help="only generate puzzles with one solution")
+    args = parser.parse_args()
+
+    puzzle = generate(args.inhabitants, args.statements,
+                      random.Random(args.seed), args.unique)
+    for statement in puzzle.statements:
+        print(statement)
+    print()
+    for symbol in KnowledgeBase(puzzle.knowledge).entailed(puzzle.symbols()):
+        print(f"    {symbol}")
+
+
+if __name__ == "__main__":
+    main()
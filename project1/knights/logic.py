@@ -1,10 +1,60 @@
 import itertools
-
-
-class Sentence():
-
-    def evaluate(self, model):
-        """Evaluates the logical sentence."""
+import weakref
+
+
+class Interned(type):
+    """Metaclass sharing one node between equal constructions of a sentence.
+
+    Operands are themselves shared, so a node is identified by its class and
+    the identities of its operands. Nodes are only held weakly, and are
+    dropped once no sentence uses them.
+
+    And can be added to, so each And() call returns a new node its caller
+    may change. Where an And becomes an operand, an unchangeable shared copy
+    takes its place, so adding to it later leaves other sentences alone.
+    """
+
+    nodes = weakref.WeakValueDictionary()
+
+    def __call__(cls, *args, **kwargs):
+        args = tuple(Interned.shared(arg) if isinstance(arg, Sentence)
+                     else arg for arg in args)
+        if kwargs or cls.mutable:
+            return super().__call__(*args, **kwargs)
+        return Interned.lookup(cls, args)
+
+    @staticmethod
+    def lookup(cls, args):
+        """Returns the shared node of cls built from shared args."""
+        key = cls.intern_key(args)
+        node = Interned.nodes.get(key)
+        if node is None:
+            node = type.__call__(cls, *args)
+            node.frozen = True
+            Interned.nodes[key] = node
+        return node
+
+    @staticmethod
+    def shared(sentence):
+        """Returns the node shared by sentences equal to sentence."""
+        if not sentence.mutable or sentence.frozen:
+            return sentence
+        return Interned.lookup(type(sentence), tuple(sentence.operands()))
+
+
+class Sentence(metaclass=Interned):
+
+    # Symbol names of the sentence, computed when first needed
+    _symbols = None
+
+    # Whether nodes can be changed, and whether this one is shared instead
+    mutable = False
+    frozen = False
+
+    def evaluate(self, model, memo=None):
+        """Evaluates the logical sentence. Compound nodes look up and store
+        their values in memo, a dict for this model, so a node shared by
+        several sentences is only evaluated once per model."""
         raise Exception("nothing to evaluate")
 
     def formula(self):
@@ -13,7 +63,20 @@ class Sentence():
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        if self._symbols is None:
+            self._symbols = frozenset().union(
+                *[operand.symbols() for operand in self.operands()])
+        return set(self._symbols)
+
+    def operands(self):
+        """Returns the sentences this sentence is built from."""
+        return []
+
+    @classmethod
+    def intern_key(cls, args):
+        """Returns the key shared by equal constructions."""
+        return (cls,) + tuple(
+            arg if isinstance(arg, str) else id(arg) for arg in args)
 
     @classmethod
     def validate(cls, sentence):
@@ -46,17 +109,19 @@ class Symbol(Sentence):
 
     def __init__(self, name):
         self.name = name
+        self._hash = hash(("symbol", name))
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name)
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        return self._hash
 
     def __repr__(self):
         return self.name
 
-    def evaluate(self, model):
+    def evaluate(self, model, memo=None):
         try:
             return bool(model[self.name])
         except KeyError:
@@ -73,39 +138,56 @@ class Not(Sentence):
     def __init__(self, operand):
         Sentence.validate(operand)
         self.operand = operand
+        self._hash = hash(("not", hash(operand)))
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and self.operand == other.operand)
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        return self._hash
 
     def __repr__(self):
         return f"Not({self.operand})"
 
-    def evaluate(self, model):
-        return not self.operand.evaluate(model)
+    def evaluate(self, model, memo=None):
+        if memo is None:
+            memo = {}
+        key = id(self)
+        value = memo.get(key)
+        if value is None:
+            value = not self.operand.evaluate(model, memo)
+            memo[key] = value
+        return value
 
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def operands(self):
+        return [self.operand]
 
 
 class And(Sentence):
+
+    mutable = True
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
+        # Computed when first needed, so add() stays constant time
+        self._hash = None
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (
+            isinstance(other, And) and self.conjuncts == other.conjuncts)
 
     def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        if self._hash is None:
+            self._hash = hash(
+                ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+            )
+        return self._hash
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,11 +196,26 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
+        """Adds a conjunct. Sentences this And was an operand of hold a
+        shared copy of it, so they do not see the new conjunct, and the
+        copy itself cannot be added to."""
         Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
-
-    def evaluate(self, model):
-        return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
+        if self.frozen:
+            raise TypeError("cannot add to an And shared by other sentences")
+        self.conjuncts.append(Interned.shared(conjunct))
+        self._hash = None
+        self._symbols = None
+
+    def evaluate(self, model, memo=None):
+        if memo is None:
+            memo = {}
+        key = id(self)
+        value = memo.get(key)
+        if value is None:
+            value = all(conjunct.evaluate(model, memo)
+                        for conjunct in self.conjuncts)
+            memo[key] = value
+        return value
 
     def formula(self):
         if len(self.conjuncts) == 1:
@@ -126,8 +223,8 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def operands(self):
+        return self.conjuncts
 
 
 class Or(Sentence):
@@ -135,21 +232,31 @@ class Or(Sentence):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
         self.disjuncts = list(disjuncts)
+        self._hash = hash(
+            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+        )
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (
+            isinstance(other, Or) and self.disjuncts == other.disjuncts)
 
     def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        return self._hash
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
 
-    def evaluate(self, model):
-        return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
+    def evaluate(self, model, memo=None):
+        if memo is None:
+            memo = {}
+        key = id(self)
+        value = memo.get(key)
+        if value is None:
+            value = any(disjunct.evaluate(model, memo)
+                        for disjunct in self.disjuncts)
+            memo[key] = value
+        return value
 
     def formula(self):
         if len(self.disjuncts) == 1:
@@ -157,8 +264,8 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def operands(self):
+        return self.disjuncts
 
 
 class Implication(Sentence):
@@ -167,29 +274,38 @@ class Implication(Sentence):
         Sentence.validate(consequent)
         self.antecedent = antecedent
         self.consequent = consequent
+        self._hash = hash(("implies", hash(antecedent), hash(consequent)))
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            isinstance(other, Implication)
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent)
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        return self._hash
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
 
-    def evaluate(self, model):
-        return ((not self.antecedent.evaluate(model))
-                or self.consequent.evaluate(model))
+    def evaluate(self, model, memo=None):
+        if memo is None:
+            memo = {}
+        key = id(self)
+        value = memo.get(key)
+        if value is None:
+            value = ((not self.antecedent.evaluate(model, memo))
+                     or self.consequent.evaluate(model, memo))
+            memo[key] = value
+        return value
 
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def operands(self):
+        return [self.antecedent, self.consequent]
 
 
 class Biconditional(Sentence):
@@ -198,35 +314,65 @@ class Biconditional(Sentence):
         Sentence.validate(right)
         self.left = left
         self.right = right
+        self._hash = hash(("biconditional", hash(left), hash(right)))
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            isinstance(other, Biconditional)
+            and self.left == other.left
+            and self.right == other.right)
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        return self._hash
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
-    def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+    def evaluate(self, model, memo=None):
+        if memo is None:
+            memo = {}
+        key = id(self)
+        value = memo.get(key)
+        if value is None:
+            left = self.left.evaluate(model, memo)
+            value = left == self.right.evaluate(model, memo)
+            memo[key] = value
+        return value
 
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def operands(self):
+        return [self.left, self.right]
+
+
+def model_check(knowledge, query, engine="enumerate", **options):
+    """Checks if knowledge base entails query.
+
+    The "enumerate" engine checks every model of the symbols, the
+    "compiled" engine evaluates compiled forms of both sentences over the
+    truth table a chunk of models at a time with compiled.py, the "parallel"
+    engine splits that work between processes with parallel.py, and the
+    "sat" engine asks the SAT solver in sat.py for a model of knowledge in
+    which query is false, which scales to many more symbols. Options, such
+    as chunk_size for "compiled", are passed on to the engine.
+    """
+    # Engines are imported here since they build on the classes in this module
+    if engine == "compiled":
+        from compiled import entails
+        return entails(knowledge, query, **options)
+    if engine == "parallel":
+        from parallel import entails
+        return entails(knowledge, query, **options)
+    if engine == "sat":
+        from sat import entails
+        return entails(knowledge, query, **options)
+    if engine != "enumerate":
+        raise ValueError(f"unknown engine {engine!r}")
+    if options:
+        raise TypeError(f"unexpected options {', '.join(options)}")
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -234,9 +380,11 @@ def model_check(knowledge, query):
         # If model has an assignment for each symbol
         if not symbols:
 
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
+            # If knowledge base is true in model, then query must also be true,
+            # evaluating each node shared between the sentences only once
+            memo = {}
+            if knowledge.evaluate(model, memo):
+                return query.evaluate(model, memo)
             return True
         else:
 
@@ -0,0 +1,72 @@
+"""Model checking across several processes.
+
+The truth table is split by fixing the first k symbols in each of the 2 ** k
+ways, and each partition is searched for a counter-model with the chunked
+evaluation of compiled.py in a pool of worker processes. As soon as one
+worker finds a counter-model the remaining partitions are cancelled, and
+the running ones notice a shared event between chunks and stop.
+"""
+
+import itertools
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from compiled import CHUNK_SIZE, Compiled, search
+
+# Partitions per worker by default, so workers that finish early can take
+# over work from slower partitions
+PARTITIONS_PER_WORKER = 4
+
+# Compiled sentences and stop event of the current worker process
+worker_state = {}
+
+
+def init_worker(knowledge, query, symbols, stop):
+    """Compiles the sentences once per worker process."""
+    worker_state["knowledge"] = Compiled(knowledge, symbols)
+    worker_state["query"] = Compiled(query, symbols)
+    worker_state["stop"] = stop
+
+
+def check_partition(fixed, chunk_size):
+    """Searches the models agreeing with fixed for a counter-model."""
+    return search(worker_state["knowledge"], worker_state["query"], fixed,
+                  chunk_size, worker_state["stop"])
+
+
+def counter_model(knowledge, query, workers=None, k=None,
+                  chunk_size=CHUNK_SIZE):
+    """Returns a model, mapping symbol names to truth values, in which
+    knowledge is true and query is false, or None if there is none, using
+    workers processes over 2 ** k partitions."""
+    symbols = sorted(knowledge.symbols() | query.symbols())
+    workers = workers or os.cpu_count()
+    if k is None:
+        k = math.ceil(math.log2(workers * PARTITIONS_PER_WORKER))
+    k = min(k, len(symbols))
+
+    stop = multiprocessing.Event()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(knowledge, query, symbols, stop)
+                             ) as executor:
+        futures = [
+            executor.submit(check_partition,
+                            dict(zip(symbols[:k], values)), chunk_size)
+            for values in itertools.product([False, True], repeat=k)
+        ]
+        for future in as_completed(futures):
+            model = future.result()
+            if model is not None:
+                stop.set()
+                for other in futures:
+                    other.cancel()
+                return model
+    return None
+
+
+def entails(knowledge, query, workers=None, k=None, chunk_size=CHUNK_SIZE):
+    """Checks if knowledge base entails query by searching partitions of
+    the truth table in parallel."""
+    return counter_model(knowledge, query, workers, k, chunk_size) is None
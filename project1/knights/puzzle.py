@@ -1,4 +1,5 @@
 from logic import *
+from sat import KnowledgeBase
 
 AKnight = Symbol("A is a Knight")
 AKnave = Symbol("A is a Knave")
@@ -95,9 +96,9 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
-            for symbol in symbols:
-                if model_check(knowledge, symbol):
-                    print(f"    {symbol}")
+            # Compiled once, then every symbol is checked incrementally
+            for symbol in KnowledgeBase(knowledge).entailed(symbols):
+                print(f"    {symbol}")
 
 
 if __name__ == "__main__":
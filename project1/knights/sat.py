@@ -0,0 +1,431 @@
+"""A conflict-driven clause learning SAT solver.
+
+The solver follows the design of MiniSat in plain Python: two watched
+literals per clause for unit propagation, first-UIP conflict analysis with
+clause learning and non-chronological backjumping, VSIDS variable activity
+with phase saving for decisions, Luby restarts and periodic removal of long
+learned clauses. Clauses use the integer literals of cnf.CNF.
+
+Entailment KB ⊨ q holds exactly when KB ∧ ¬q is unsatisfiable, so
+entails() answers logic.model_check without enumerating models.
+"""
+
+import heapq
+
+from cnf import CNF
+
+# Conflicts between restarts are this times the Luby sequence
+RESTART_BASE = 100
+
+# Multiplier applied to the activity bump after each conflict
+VARIABLE_DECAY = 0.95
+
+
+def luby(i):
+    """Returns the i-th element (from 0) of the Luby sequence
+    1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ..."""
+    size, exponent = 1, 0
+    while size < i + 1:
+        exponent += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) // 2
+        exponent -= 1
+        i %= size
+    return 2 ** exponent
+
+
+class Solver():
+    """An incremental SAT solver over variables 1 to num_variables."""
+
+    def __init__(self, num_variables=0):
+        # Value of each variable: 1 true, -1 false, 0 unassigned
+        self.values = [0]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phases = [False]
+        self.watches = {}
+        self.order = []
+
+        self.clauses = []
+        self.learnts = []
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+        self.ok = True
+        self.increment = 1.0
+        self.max_learnts = 1000
+
+        # Solution of the latest satisfiable solve, indexed by variable
+        self.model = None
+
+        self.decisions = 0
+        self.propagations = 0
+        self.conflicts = 0
+        self.restarts = 0
+
+        self.ensure_variables(num_variables)
+
+    @classmethod
+    def from_cnf(cls, cnf):
+        """Returns a solver holding the clauses of a cnf.CNF."""
+        solver = cls(cnf.num_variables)
+        for clause in cnf.clauses:
+            solver.add_clause(clause)
+        return solver
+
+    @property
+    def num_variables(self):
+        return len(self.values) - 1
+
+    def ensure_variables(self, n):
+        """Makes variables up to n available."""
+        for variable in range(self.num_variables + 1, n + 1):
+            self.values.append(0)
+            self.levels.append(0)
+            self.reasons.append(None)
+            self.activity.append(0.0)
+            self.phases.append(False)
+            self.watches[variable] = []
+            self.watches[-variable] = []
+            heapq.heappush(self.order, (0.0, variable))
+
+    def value(self, literal):
+        """Returns 1 if a literal is true, -1 if false, 0 if unassigned."""
+        if literal > 0:
+            return self.values[literal]
+        return -self.values[-literal]
+
+    def add_clause(self, literals):
+        """Adds a clause between solves. Returns False if the clauses have
+        become unsatisfiable."""
+        if not self.ok:
+            return False
+        self.ensure_variables(max((abs(literal) for literal in literals),
+                                  default=0))
+        clause = []
+        for literal in dict.fromkeys(literals):
+            value = self.value(literal)
+            if value == 1 or -literal in clause:
+                # Satisfied at level 0, or a tautology
+                return True
+            if value == 0:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.enqueue(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.clauses.append(clause)
+            self.watch(clause)
+        return self.ok
+
+    def watch(self, clause):
+        self.watches[-clause[0]].append(clause)
+        self.watches[-clause[1]].append(clause)
+
+    def enqueue(self, literal, reason):
+        """Makes a literal true, implied by reason or decided if None."""
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """Propagates every unit clause, returning a conflicting clause or
+        None.
+
+        Clauses are listed under the negation of each of their two watched
+        literals, clause[0] and clause[1], so making a literal true visits
+        only the clauses in which it made a watched literal false.
+        """
+        values = self.values
+        watches = self.watches
+        trail = self.trail
+        while self.head < len(trail):
+            literal = trail[self.head]
+            self.head += 1
+            self.propagations += 1
+            false_literal = -literal
+            watching = watches[literal]
+            kept = []
+            conflict = None
+            for index, clause in enumerate(watching):
+                # Make the false literal the second watch
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], false_literal
+                first = clause[0]
+                if (values[first] if first > 0 else -values[-first]) == 1:
+                    kept.append(clause)
+                    continue
+
+                # Look for a replacement watch that is not false
+                for k in range(2, len(clause)):
+                    other = clause[k]
+                    if (values[other] if other > 0 else -values[-other]) != -1:
+                        clause[1], clause[k] = other, false_literal
+                        watches[-other].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if (values[first] if first > 0 else -values[-first]) == -1:
+                        conflict = clause
+                        kept.extend(watching[index + 1:])
+                        break
+                    self.enqueue(first, clause)
+            watches[literal] = kept
+            if conflict is not None:
+                self.head = len(trail)
+                return conflict
+        return None
+
+    def decision_level(self):
+        return len(self.trail_limits)
+
+    def cancel_until(self, level):
+        """Undoes every assignment above a decision level."""
+        if self.decision_level() <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.values[variable] = 0
+            self.reasons[variable] = None
+            self.phases[variable] = literal > 0
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.head = len(self.trail)
+
+    def bump(self, variable):
+        """Raises the activity of a variable involved in a conflict."""
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            # Rescale everything to avoid overflow
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+            self.order = [(-self.activity[variable], variable)
+                          for variable in range(1, self.num_variables + 1)
+                          if self.values[variable] == 0]
+            heapq.heapify(self.order)
+        elif self.values[variable] == 0:
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+
+    def analyze(self, conflict):
+        """Returns the first-UIP clause learned from a conflict, asserting
+        literal first, and the level to backjump to."""
+        levels = self.levels
+        level = self.decision_level()
+        seen = set()
+        learnt = [None]
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for other in clause if literal is None else clause[1:]:
+                variable = abs(other)
+                if variable in seen or levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if levels[variable] == level:
+                    pending += 1
+                else:
+                    learnt.append(other)
+            # Walk back to the next literal of this level in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(literal)]
+            seen.discard(abs(literal))
+        learnt[0] = -literal
+
+        if len(learnt) == 1:
+            return learnt, 0
+        # Watch the literal assigned last after the asserting one
+        deepest = max(range(1, len(learnt)),
+                      key=lambda i: levels[abs(learnt[i])])
+        learnt[1], learnt[deepest] = learnt[deepest], learnt[1]
+        return learnt, levels[abs(learnt[1])]
+
+    def reduce_learnts(self):
+        """Forgets the longer half of the learned clauses that are not
+        currently the reason for an assignment."""
+        locked = {id(self.reasons[abs(literal)]) for literal in self.trail}
+        self.learnts.sort(key=len)
+        keep = len(self.learnts) // 2
+        self.learnts = self.learnts[:keep] + [
+            clause for clause in self.learnts[keep:] if id(clause) in locked]
+        for literal in self.watches:
+            self.watches[literal] = []
+        for clause in self.clauses:
+            self.watch(clause)
+        for clause in self.learnts:
+            self.watch(clause)
+
+    def pick_branch(self):
+        """Returns the unassigned variable of highest activity, with its
+        saved phase, or None if every variable is assigned."""
+        while self.order:
+            _, variable = heapq.heappop(self.order)
+            if self.values[variable] == 0:
+                return variable if self.phases[variable] else -variable
+        return None
+
+    def solve(self, assumptions=()):
+        """Returns True if the clauses are satisfiable with every literal
+        in assumptions true, setting model, or False if not."""
+        self.model = None
+        if not self.ok:
+            return False
+        self.ensure_variables(max((abs(literal) for literal in assumptions),
+                                  default=0))
+        restart = 0
+        restart_conflicts = RESTART_BASE * luby(restart)
+        conflicts = 0
+        try:
+            while True:
+                conflict = self.propagate()
+                if conflict is not None:
+                    self.conflicts += 1
+                    conflicts += 1
+                    if self.decision_level() == 0:
+                        self.ok = False
+                        return False
+                    learnt, level = self.analyze(conflict)
+                    self.cancel_until(level)
+                    if len(learnt) == 1:
+                        self.enqueue(learnt[0], None)
+                    else:
+                        self.learnts.append(learnt)
+                        self.watch(learnt)
+                        self.enqueue(learnt[0], learnt)
+                    self.increment /= VARIABLE_DECAY
+                    continue
+
+                if conflicts >= restart_conflicts:
+                    self.restarts += 1
+                    restart += 1
+                    restart_conflicts = RESTART_BASE * luby(restart)
+                    conflicts = 0
+                    self.cancel_until(0)
+                if len(self.learnts) - len(self.trail) >= self.max_learnts:
+                    self.reduce_learnts()
+                    self.max_learnts = int(self.max_learnts * 1.1)
+
+                # Decide the assumptions first, one level each
+                decision = None
+                while self.decision_level() < len(assumptions):
+                    literal = assumptions[self.decision_level()]
+                    value = self.value(literal)
+                    if value == 1:
+                        self.trail_limits.append(len(self.trail))
+                    elif value == -1:
+                        return False
+                    else:
+                        decision = literal
+                        break
+                if decision is None:
+                    decision = self.pick_branch()
+                    if decision is None:
+                        self.model = [value == 1 for value in self.values]
+                        return True
+                self.decisions += 1
+                self.trail_limits.append(len(self.trail))
+                self.enqueue(decision, None)
+        finally:
+            self.cancel_until(0)
+
+
+class KnowledgeBase():
+    """Sentences compiled once into a solver that answers queries under
+    assumptions, keeping what it learned between queries."""
+
+    def __init__(self, *sentences):
+        self.cnf = CNF()
+        self.solver = Solver()
+        self.synced = 0
+        self.solves = 0
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Asserts that a sentence is true."""
+        self.cnf.add(sentence)
+        self.sync()
+
+    def sync(self):
+        """Passes clauses added to the CNF since the last call to the
+        solver."""
+        for clause in self.cnf.clauses[self.synced:]:
+            self.solver.add_clause(clause)
+        self.synced = len(self.cnf.clauses)
+        # Variables whose clauses were all dropped as tautologies
+        self.solver.ensure_variables(self.cnf.num_variables)
+
+    def literal(self, sentence):
+        """Returns the literal of a sentence, defining it if new."""
+        literal = self.cnf.literal(sentence)
+        self.sync()
+        return literal
+
+    def solve(self, literals):
+        self.solves += 1
+        return self.solver.solve(literals)
+
+    def satisfiable(self, assumptions=()):
+        """Checks if the sentences and assumptions can all be true."""
+        return self.solve([self.literal(sentence) for sentence in assumptions])
+
+    def model(self, assumptions=()):
+        """Returns a model of the sentences and assumptions mapping symbol
+        names to truth values, or None if there is none."""
+        if not self.satisfiable(assumptions):
+            return None
+        return self.cnf.decode(self.solver.model)
+
+    def entails(self, query, assumptions=()):
+        """Checks if the sentences and assumptions entail query."""
+        literals = [self.literal(sentence) for sentence in assumptions]
+        return not self.solve(literals + [-self.literal(query)])
+
+    def entailed(self, queries, assumptions=()):
+        """Returns the queries entailed by the sentences and assumptions.
+
+        Rather than one solve per query, each solve asks for a model in
+        which some remaining query is false. Queries true in the model
+        found stay candidates, and once no such model exists they are all
+        entailed, so a query whose answer is forced costs no extra solve.
+        """
+        literals = [self.literal(sentence) for sentence in assumptions]
+        candidates = {query: self.literal(query) for query in queries}
+        while candidates:
+            # A fresh selector variable switches the clause on for one solve
+            selector = self.cnf.new_variable()
+            self.solver.add_clause(
+                [-selector] + [-literal for literal in candidates.values()])
+            found = self.solve(literals + [selector])
+            model = self.solver.model
+            self.solver.add_clause([-selector])
+            if not found:
+                break
+            candidates = {
+                query: literal for query, literal in candidates.items()
+                if model[abs(literal)] == (literal > 0)
+            }
+        return [query for query in queries if query in candidates]
+
+
+def entails(knowledge, query):
+    """Checks if knowledge base entails query, by showing that knowledge
+    and the negation of query cannot both be true."""
+    return KnowledgeBase(knowledge).entails(query)
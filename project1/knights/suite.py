@@ -0,0 +1,137 @@
+"""
+Knights puzzle benchmark suite
+
+Usage: python suite.py [--inhabitants N [N ...]] [--ratio R] [--puzzles P]
+                       [--engines ENGINE [ENGINE ...]] [--workers W]
+                       [--budget SECONDS] [--seed S] [--results FILE]
+
+Generates P random puzzles for each number of inhabitants N, with R
+statements per inhabitant, and solves each one with every model_check
+engine the way puzzle.py does, checking every symbol. The number of
+symbols and CNF clauses, wall time and peak memory of each solve are
+written to a CSV results file. Peak memory is measured by tracemalloc in a
+second, untimed solve, and covers only this process, not the workers of
+the parallel engine. An engine is dropped for larger puzzles once a solve
+takes longer than the budget, or, for the engines that go through the truth
+table, once doubling its last time for each extra symbol would.
+"""
+
+import argparse
+import csv
+import math
+import random
+import time
+import tracemalloc
+
+from cnf import to_cnf
+from generator import generate
+from logic import model_check
+from sat import KnowledgeBase
+
+ENGINES = ["enumerate", "compiled", "parallel", "sat"]
+
+# Engines whose time doubles with each extra symbol
+TRUTH_TABLE_ENGINES = {"enumerate", "compiled", "parallel"}
+
+FIELDS = ["engine", "inhabitants", "statements", "puzzle", "symbols",
+          "clauses", "seconds", "peak_kib", "entailed"]
+
+
+def solve(puzzle, engine, options):
+    """Returns the symbols of a puzzle that its knowledge entails."""
+    return [symbol for symbol in puzzle.symbols()
+            if model_check(puzzle.knowledge, symbol, engine=engine,
+                           **options)]
+
+
+def measure(puzzle, engine, options):
+    """Returns (entailed symbols, seconds, peak KiB) of solving a puzzle."""
+    start = time.perf_counter()
+    entailed = solve(puzzle, engine, options)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        solve(puzzle, engine, options)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return entailed, seconds, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Knights benchmark suite")
+    parser.add_argument("--inhabitants", type=int, nargs="+",
+                        default=[2, 4, 6, 8, 10, 12, 16, 32, 64])
+    parser.add_argument("--ratio", type=float, default=2.0,
+                        help="statements per inhabitant")
+    parser.add_argument("--puzzles", type=int, default=3,
+                        help="puzzles per number of inhabitants")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES,
+                        default=ENGINES)
+    parser.add_argument("--workers", type=int,
+                        help="worker processes for the parallel engine")
+    parser.add_argument("--budget", type=float, default=10.0,
+                        help="seconds after which to drop an engine")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--results", default="results.csv")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    options = {engine: {} for engine in args.engines}
+    if "parallel" in options:
+        options["parallel"]["workers"] = args.workers
+    engines = list(args.engines)
+    # Symbols and seconds of the latest solve of each engine
+    latest = {}
+
+    with open(args.results, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for inhabitants in sorted(args.inhabitants):
+            statements = math.ceil(args.ratio * inhabitants)
+            for index in range(args.puzzles):
+                puzzle = generate(inhabitants, statements, rng)
+                symbols = len(puzzle.symbols())
+                clauses = len(to_cnf(puzzle.knowledge).clauses)
+                expected = KnowledgeBase(puzzle.knowledge).entailed(
+                    puzzle.symbols())
+
+                for engine in list(engines):
+                    if engine in TRUTH_TABLE_ENGINES and engine in latest:
+                        last_symbols, last_seconds = latest[engine]
+                        if (last_seconds * 2 ** (symbols - last_symbols)
+                                > args.budget):
+                            print(f"{engine} would be over budget, "
+                                  f"dropping it")
+                            engines.remove(engine)
+                            continue
+                    entailed, seconds, peak = measure(puzzle, engine,
+                                                      options[engine])
+                    latest[engine] = symbols, seconds
+                    if entailed != expected:
+                        raise AssertionError(
+                            f"{engine} solved a puzzle of {inhabitants} "
+                            f"inhabitants wrongly")
+                    writer.writerow({
+                        "engine": engine,
+                        "inhabitants": inhabitants,
+                        "statements": statements,
+                        "puzzle": index,
+                        "symbols": symbols,
+                        "clauses": clauses,
+                        "seconds": f"{seconds:.6f}",
+                        "peak_kib": f"{peak:.1f}",
+                        "entailed": len(entailed),
+                    })
+                    f.flush()
+                    print(f"{engine:>9} {inhabitants:>3} inhabitants "
+                          f"{symbols:>4} symbols {clauses:>5} clauses "
+                          f"{seconds:>9.4f}s {peak:>10.1f} KiB", flush=True)
+                    if seconds > args.budget:
+                        print(f"{engine} is over budget, dropping it")
+                        engines.remove(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+import gc
+import itertools
+import random
+import threading
+import unittest
+
+import puzzle
+from cnf import CNF, to_cnf
+import generator
+import parallel
+from compiled import Compiled, counter_model, search, transpose, truth_table
+from logic import (Interned, Symbol, Not, And, Or, Implication,
+                   Biconditional, model_check)
+from sat import KnowledgeBase, Solver, luby
+
+P = Symbol("P")
+Q = Symbol("Q")
+R = Symbol("R")
+
+PUZZLES = [puzzle.knowledge0, puzzle.knowledge1, puzzle.knowledge2,
+           puzzle.knowledge3]
+SYMBOLS = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight, puzzle.BKnave,
+           puzzle.CKnight, puzzle.CKnave]
+
+
+def satisfied(cnf, values):
+    """Returns True if values, indexed by variable, satisfy every clause."""
+    return all(
+        any(values[literal] if literal > 0 else not values[-literal]
+            for literal in clause)
+        for clause in cnf.clauses
+    )
+
+
+def extendable(cnf, model):
+    """Returns True if some assignment of the auxiliary variables extends
+    model to one satisfying the clauses."""
+    auxiliary = [variable for variable in range(1, cnf.num_variables + 1)
+                 if cnf.names[variable] is None]
+    values = [None] * (cnf.num_variables + 1)
+    for name, variable in cnf.variables.items():
+        values[variable] = model[name]
+    for bits in itertools.product([False, True], repeat=len(auxiliary)):
+        for variable, bit in zip(auxiliary, bits):
+            values[variable] = bit
+        if satisfied(cnf, values):
+            return True
+    return False
+
+
+class TestSentenceMethods(unittest.TestCase):
+
+    def test_shared_nodes(self):
+        self.assertIs(Symbol("P"), P)
+        self.assertIs(Or(P, Not(Q)), Or(P, Not(Q)))
+        self.assertIs(Biconditional(P, Or(Q, R)).right, Or(Q, R))
+        self.assertIs(Not(And(P, Q)), Not(And(P, Q)))
+        self.assertIs(Not(And(P, Q)).operand, Or(And(P, Q)).disjuncts[0])
+        self.assertIsNot(And(P, Q), And(Q, P))
+        self.assertIsNot(And(P, Q), Or(P, Q))
+        self.assertEqual(hash(Implication(P, Q)), hash(Implication(P, Q)))
+
+        key = Symbol.intern_key(("S",))
+        Symbol("S")
+        gc.collect()
+        self.assertNotIn(key, Interned.nodes)
+
+    def test_add(self):
+        self.assertIsNot(And(), And())
+        first = And(P)
+        self.assertIsNot(And(P), first)
+        first.add(Q)
+        self.assertEqual(first, And(P, Q))
+        self.assertEqual(hash(first), hash(And(P, Q)))
+        self.assertEqual(first.symbols(), {"P", "Q"})
+
+    def test_add_to_operand(self):
+        sub = And(P, Q)
+        outer = Or(sub, R)
+        # outer holds a shared copy of sub, not sub itself
+        self.assertIsNot(outer.disjuncts[0], sub)
+        self.assertIs(outer.disjuncts[0], Not(sub).operand)
+        knowledge = And(P, Q)
+        before = hash(outer)
+        for sentence in [knowledge, sub]:
+            sentence.add(R)
+            self.assertEqual(sentence, And(P, Q, R))
+            self.assertEqual(outer, Or(And(P, Q), R))
+            self.assertNotEqual(outer, Or(And(P, Q, R), R))
+            self.assertEqual(hash(outer), before)
+            self.assertEqual(hash(outer), hash(Or(And(P, Q), R)))
+            self.assertTrue(outer.evaluate({"P": True, "Q": True,
+                                            "R": False}))
+        with self.assertRaises(TypeError):
+            outer.disjuncts[0].add(R)
+
+    def test_symbols(self):
+        sentence = Implication(And(P, Q), Or(Not(R), P))
+        symbols = sentence.symbols()
+        self.assertEqual(symbols, {"P", "Q", "R"})
+        symbols.add("S")
+        self.assertEqual(sentence.symbols(), {"P", "Q", "R"})
+        self.assertEqual(And().symbols(), set())
+
+    def test_memo(self):
+        model = {symbol.name: False for symbol in SYMBOLS}
+        model.update({"A is a Knave": True, "B is a Knight": True})
+        memo = {}
+        self.assertTrue(puzzle.knowledge2.evaluate(model, memo))
+        # And(AKnight, BKnight) and And(AKnave, BKnave) each appear four
+        # times, but the 21 compound nodes written share 13 objects
+        shared = Not(And(puzzle.AKnight, puzzle.BKnight)).operand
+        self.assertIn(id(shared), memo)
+        self.assertEqual(len(memo), 13)
+
+
+class TestCNFMethods(unittest.TestCase):
+
+    def test_equisatisfiable(self):
+        sentences = PUZZLES + [
+            Implication(P, Or(Q, Not(R))),
+            Biconditional(And(P, Q), Or(Not(P), R)),
+            Not(Biconditional(P, Implication(Q, R))),
+        ]
+        for sentence in sentences:
+            cnf = to_cnf(sentence)
+            names = sorted(sentence.symbols())
+            for bits in itertools.product([False, True], repeat=len(names)):
+                model = dict(zip(names, bits))
+                self.assertEqual(extendable(cnf, model),
+                                 sentence.evaluate(model))
+
+    def test_shared_subsentences(self):
+        cnf = CNF()
+        first = cnf.literal(And(P, Q))
+        clauses = len(cnf.clauses)
+        self.assertEqual(cnf.literal(And(P, Q)), first)
+        self.assertEqual(cnf.literal(Not(And(P, Q))), -first)
+        self.assertEqual(len(cnf.clauses), clauses)
+
+    def test_clauses(self):
+        cnf = to_cnf(Or(P, Not(P)), Implication(P, Q))
+        self.assertEqual(cnf.clauses, [(-1, 2)])
+        self.assertEqual(cnf.dimacs(), "c 1 P\nc 2 Q\np cnf 2 1\n-1 2 0\n")
+        self.assertEqual(cnf.decode([None, True, False]),
+                         {"P": True, "Q": False})
+
+
+class TestCompiledMethods(unittest.TestCase):
+
+    def test_evaluate(self):
+        sentences = PUZZLES + [
+            Implication(P, Or(Q, Not(R))),
+            Biconditional(And(P, Q), Or(Not(P), R)),
+            And(P, Or()),
+            Or(Not(Q), And()),
+        ]
+        names = ["P", "Q", "R"] + [symbol.name for symbol in SYMBOLS]
+        for sentence in sentences:
+            compiled = Compiled(sentence, names)
+            rows = []
+            for bits in range(1 << len(names)):
+                model = {name: bool(bits >> i & 1)
+                         for i, name in enumerate(names)}
+                expected = sentence.evaluate(model)
+                self.assertEqual(compiled.evaluate(model), expected)
+                self.assertEqual(compiled.evaluate_bits(bits), expected)
+                rows.append(expected)
+            table = compiled.evaluate_batch(truth_table(len(names)),
+                                            1 << len(names))
+            self.assertEqual(
+                [bool(table >> bits & 1) for bits in range(len(rows))], rows)
+
+    def test_batches(self):
+        self.assertEqual(truth_table(3), [0b10101010, 0b11001100, 0b11110000])
+        self.assertEqual(transpose([0b01, 0b11, 0b10], 2), [0b011, 0b110])
+        compiled = Compiled(Implication(P, Q))
+        self.assertEqual(compiled.symbols, ["P", "Q"])
+        self.assertEqual(
+            compiled.evaluate_batch(transpose([0b01, 0b11, 0b10], 2), 3),
+            0b110)
+
+    def test_long_sentences(self):
+        symbols = [Symbol(f"x{i}") for i in range(1000)]
+        compiled = Compiled(Or(*symbols))
+        self.assertFalse(compiled.evaluate_bits(0))
+        self.assertTrue(compiled.evaluate_bits(1 << 999))
+
+    def test_model_check(self):
+        for knowledge in PUZZLES:
+            for symbol in SYMBOLS:
+                self.assertEqual(
+                    model_check(knowledge, symbol, engine="compiled"),
+                    model_check(knowledge, symbol))
+        with self.assertRaises(ValueError):
+            Compiled(P, ["Q"])
+
+    def test_chunks(self):
+        knowledge = And(puzzle.knowledge3, Or(P, Q), Implication(P, R))
+        for query in SYMBOLS + [P, Q, R, Or(Q, R), Not(P)]:
+            expected = model_check(knowledge, query)
+            for chunk_size in [1, 3, 4, 64, 1 << 20]:
+                model = counter_model(knowledge, query, chunk_size)
+                self.assertEqual(model is None, expected)
+                if model is not None:
+                    self.assertTrue(knowledge.evaluate(model))
+                    self.assertFalse(query.evaluate(model))
+                self.assertEqual(model_check(knowledge, query,
+                                             engine="compiled",
+                                             chunk_size=chunk_size),
+                                 expected)
+        with self.assertRaises(ValueError):
+            counter_model(P, Q, chunk_size=0)
+        with self.assertRaises(TypeError):
+            model_check(P, Q, chunk_size=4)
+
+    def test_search(self):
+        knowledge = Compiled(Or(P, Q), ["P", "Q", "R"])
+        query = Compiled(P, ["P", "Q", "R"])
+        self.assertEqual(search(knowledge, query, {"R": True}),
+                         {"P": False, "Q": True, "R": True})
+        self.assertIsNone(search(knowledge, query, {"Q": False}))
+        stop = threading.Event()
+        stop.set()
+        self.assertIsNone(search(knowledge, query, stop=stop))
+        with self.assertRaises(ValueError):
+            search(knowledge, Compiled(P))
+
+    def test_parallel(self):
+        knowledge = And(puzzle.knowledge3, Or(P, Q), Implication(P, R))
+        for query in [puzzle.AKnight, puzzle.BKnight, Or(Q, R), Not(P)]:
+            expected = model_check(knowledge, query)
+            model = parallel.counter_model(knowledge, query, workers=2, k=2,
+                                           chunk_size=4)
+            self.assertEqual(model is None, expected)
+            if model is not None:
+                self.assertTrue(knowledge.evaluate(model))
+                self.assertFalse(query.evaluate(model))
+        self.assertEqual(model_check(knowledge, R, engine="parallel",
+                                     workers=2),
+                         model_check(knowledge, R))
+
+
+class TestSATMethods(unittest.TestCase):
+
+    def test_random_clauses(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            n = rng.randint(1, 8)
+            cnf = CNF()
+            for variable in range(n):
+                cnf.variable(str(variable))
+            for _ in range(rng.randint(0, 40)):
+                cnf.add_clause([rng.choice([-1, 1]) * rng.randint(1, n)
+                                for _ in range(rng.randint(1, 3))])
+            solver = Solver.from_cnf(cnf)
+            solver.max_learnts = 2
+            for _ in range(3):
+                assumptions = [rng.choice([-1, 1]) * rng.randint(1, n)
+                               for _ in range(rng.randint(0, 2))]
+                expected = any(
+                    satisfied(cnf, (None,) + bits) and
+                    all(bits[abs(literal) - 1] == (literal > 0)
+                        for literal in assumptions)
+                    for bits in itertools.product([False, True], repeat=n)
+                )
+                self.assertEqual(solver.solve(assumptions), expected)
+                if expected:
+                    self.assertTrue(satisfied(cnf, solver.model))
+                    for literal in assumptions:
+                        self.assertEqual(solver.model[abs(literal)],
+                                         literal > 0)
+
+    def test_incremental(self):
+        solver = Solver()
+        self.assertTrue(solver.add_clause([1, 2]))
+        self.assertTrue(solver.solve([-1]))
+        self.assertEqual(solver.model[1:], [False, True])
+        self.assertFalse(solver.solve([-1, -2]))
+        self.assertTrue(solver.add_clause([-2]))
+        self.assertTrue(solver.solve())
+        self.assertFalse(solver.add_clause([-1]))
+        self.assertFalse(solver.solve())
+
+    def test_luby(self):
+        self.assertEqual([luby(i) for i in range(15)],
+                         [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8])
+
+    def test_model_check_engines(self):
+        for knowledge in PUZZLES:
+            for symbol in SYMBOLS:
+                self.assertEqual(model_check(knowledge, symbol, engine="sat"),
+                                 model_check(knowledge, symbol))
+        self.assertTrue(model_check(And(P, Not(P)), Q, engine="sat"))
+        self.assertTrue(model_check(P, Or(P, Q), engine="sat"))
+        self.assertFalse(model_check(Or(P, Q), P, engine="sat"))
+        with self.assertRaises(ValueError):
+            model_check(P, P, engine="magic")
+
+
+class TestKnowledgeBaseMethods(unittest.TestCase):
+
+    def test_entailed(self):
+        for knowledge in PUZZLES:
+            kb = KnowledgeBase(knowledge)
+            expected = [symbol for symbol in SYMBOLS
+                        if model_check(knowledge, symbol)]
+            self.assertEqual(kb.entailed(SYMBOLS), expected)
+            # Every puzzle has one solution, found by the first solve
+            self.assertEqual(kb.solves, 2)
+            for symbol in SYMBOLS:
+                self.assertEqual(kb.entails(symbol), symbol in expected)
+
+    def test_assumptions(self):
+        kb = KnowledgeBase(Or(P, Q), Implication(P, R))
+        self.assertFalse(kb.entails(P))
+        self.assertTrue(kb.entails(P, assumptions=[Not(Q)]))
+        self.assertTrue(kb.entails(R, assumptions=[Not(Q)]))
+        self.assertEqual(kb.entailed([P, Q, R], assumptions=[Not(R)]), [Q])
+        self.assertEqual(kb.model([Not(Q)]),
+                         {"P": True, "Q": False, "R": True})
+        self.assertIsNone(kb.model([Not(P), Not(Q)]))
+
+        kb.add(Not(R))
+        self.assertTrue(kb.entails(Q))
+        self.assertEqual(kb.entailed([P, Q, R]), [Q])
+        self.assertFalse(kb.satisfiable([P]))
+
+    def test_inconsistent(self):
+        kb = KnowledgeBase(P, Not(P))
+        self.assertFalse(kb.satisfiable())
+        self.assertEqual(kb.entailed([P, Not(Q)]), [P, Not(Q)])
+
+    def test_tautology(self):
+        # The symbols only appear in clauses dropped as tautologies
+        self.assertEqual(KnowledgeBase(Or(P, Not(P))).model().keys(), {"P"})
+        kb = KnowledgeBase(And(P, Or(Q, Not(Q))))
+        self.assertEqual(kb.model().keys(), {"P", "Q"})
+        self.assertTrue(kb.model()["P"])
+        self.assertFalse(kb.entails(Q))
+
+
+class TestGeneratorMethods(unittest.TestCase):
+
+    def test_names(self):
+        names = [generator.inhabitant_name(i)
+                 for i in [0, 25, 26, 27, 701, 702]]
+        self.assertEqual(names, ["A", "Z", "AA", "AB", "ZZ", "AAA"])
+
+    def test_consistent(self):
+        rng = random.Random(0)
+        for inhabitants in [2, 3, 5, 8]:
+            puzzle = generator.generate(inhabitants, 2 * inhabitants, rng)
+            self.assertEqual(len(puzzle.statements), 2 * inhabitants)
+            self.assertEqual(len(puzzle.knowledge.conjuncts),
+                             6 * inhabitants)
+            self.assertTrue(puzzle.knowledge.evaluate(puzzle.model()))
+            kb = KnowledgeBase(puzzle.knowledge)
+            model = puzzle.model()
+            for symbol in kb.entailed(puzzle.symbols()):
+                self.assertTrue(model[symbol.name])
+
+    def test_unique(self):
+        rng = random.Random(1)
+        puzzle = generator.generate(4, 6, rng, unique=True)
+        model = puzzle.model()
+        self.assertEqual(
+            {symbol.name for symbol in puzzle.symbols()
+             if model_check(puzzle.knowledge, symbol)},
+            {name for name, value in model.items() if value})
+        with self.assertRaises(ValueError):
+            generator.generate(1, 1, rng)
+        with self.assertRaises(ValueError):
+            generator.generate(8, 0, rng, unique=True)
+
+
+if __name__ == "__main__":
+    unittest.main()